@@ -0,0 +1,228 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import as_completed
+from dataclasses import dataclass, field
+
+from candles import Candles, numeric_column
+from indicators import calculate_sma, calculate_rsi, calculate_macd, calculate_stochastic, calculate_fibonacci, calculate_atr
+from candlestick_patterns import scan_candlesticks
+from chart_patterns import find_swing_points, detect_head_and_shoulders, detect_triangle, detect_double_top, detect_double_bottom
+from support_resistance import calculate_support_resistance
+from risk_reward import calculate_risk_reward, calculate_exits
+from metrics import metrics
+
+# Columns sent to analysis workers
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# Signal messages
+BULLISH = "Price likely to go up from here."
+BEARISH = "Price likely to go down from here."
+
+
+@dataclass
+class SignalResult:
+    """Outcome of analyzing one symbol"""
+    symbol: str
+    confirmations: int = 0
+    reasons: list = field(default_factory=list)
+    message: str = None
+    confirmed: bool = False
+    entry_price: float = None
+    stop_loss: float = None
+    take_profit: float = None
+    risk_reward: float = None
+    patterns: dict = field(default_factory=dict)
+    indicators: dict = field(default_factory=dict)
+    timings: dict = field(default_factory=dict)
+
+
+def pack_candles(data):
+    """Pack the price columns of a kline DataFrame or Candles into float64 arrays
+
+    The arrays pickle as compact binary buffers, much smaller and faster to
+    send to a worker process than an object-dtype DataFrame of strings.
+    """
+    if isinstance(data, Candles):
+        return {column: getattr(data, column) for column in PRICE_COLUMNS}
+    return {column: numeric_column(data, column) for column in PRICE_COLUMNS}
+
+
+def analyze(symbol, data, min_confirmations=3, stop_atr=None, take_atr=None, atr_period=14):
+    """Run every indicator, pattern and support/resistance check on one symbol
+
+    Pure function of the candles: the input frame is not modified and nothing
+    is printed, so it can run in a worker process. The seconds spent in each
+    stage are returned in result.timings for the caller to record.
+
+    Stop-loss and take-profit are 2% below and 5% above the entry, or
+    stop_atr and take_atr multiples of the ATR when those are given.
+    """
+    started = time.perf_counter()
+    data = Candles(**pack_candles(data))
+    close = data.close[-1]
+    result = SignalResult(symbol)
+
+    def lap(stage):
+        nonlocal started
+        now = time.perf_counter()
+        result.timings[stage] = now - started
+        started = now
+
+    def confirm(reason, message):
+        result.confirmations += 1
+        result.reasons.append(reason)
+        result.message = message
+
+    # Calculate indicators
+    sma = calculate_sma(data, period=14)
+    rsi = calculate_rsi(data)
+    macd = calculate_macd(data)
+    stochastic = calculate_stochastic(data)
+    result.indicators = {name: float(level) for name, level in calculate_fibonacci(data).items()}
+    result.indicators['stochastic_k'] = float(stochastic['stochastic_k'].iloc[-1])
+    result.indicators['stochastic_d'] = float(stochastic['stochastic_d'].iloc[-1])
+    lap('indicators')
+
+    # Detect candlestick patterns
+    candlesticks = scan_candlesticks(data)['results']
+
+    # Detect chart patterns from one shared set of swing points
+    pivots = find_swing_points(data)
+    result.patterns = {
+        'head_and_shoulders': detect_head_and_shoulders(data, pivots),
+        'triangle': detect_triangle(data, pivots),
+        'double_top': detect_double_top(data, pivots),
+        'double_bottom': detect_double_bottom(data, pivots),
+        **candlesticks
+    }
+    lap('patterns')
+
+    # Calculate support and resistance
+    support, resistance = calculate_support_resistance(data)
+    lap('support_resistance')
+
+    # SMA Confirmation
+    if len(sma) > 0:
+        if close > sma.iloc[-1]:
+            confirm("Price above SMA", BULLISH)
+        elif close < sma.iloc[-1]:
+            confirm("Price below SMA", BEARISH)
+
+    # RSI Confirmation
+    if len(rsi) > 0:
+        if rsi.iloc[-1] < 30:
+            confirm("RSI oversold", BULLISH)
+        elif rsi.iloc[-1] > 70:
+            confirm("RSI overbought", BEARISH)
+
+    # MACD Confirmation
+    macd_line, signal_line = macd['macd_line'], macd['signal_line']
+    if len(macd_line) > 1:
+        if macd_line.iloc[-1] > signal_line.iloc[-1] and macd_line.iloc[-2] < signal_line.iloc[-2]:
+            confirm("Bullish MACD crossover", BULLISH)
+        elif macd_line.iloc[-1] < signal_line.iloc[-1] and macd_line.iloc[-2] > signal_line.iloc[-2]:
+            confirm("Bearish MACD crossover", BEARISH)
+
+    # Candlestick Patterns
+    if candlesticks['engulfing'] == 'bullish' or candlesticks['hammer'] == 'hammer' or candlesticks['morning_star'] == 'morning_star':
+        confirm("Bullish candlestick pattern", BULLISH)
+    elif candlesticks['shooting_star'] == 'shooting_star' or candlesticks['hanging_man'] == 'hanging_man':
+        confirm("Bearish candlestick pattern", BEARISH)
+
+    # Support/Resistance Breakout
+    if support is not None and resistance is not None:
+        if close > resistance:
+            confirm("Breakout above resistance", BULLISH)
+        elif close < support:
+            confirm("Breakdown below support", BEARISH)
+
+    result.confirmed = result.confirmations >= min_confirmations
+    if result.confirmed and result.message == BULLISH:
+        # Entry Price, Stop Loss (2% or stop_atr ATRs below entry) and Take Profit (5% or take_atr ATRs above entry)
+        result.entry_price = float(close)
+        atr = calculate_atr(data, atr_period).iloc[-1] if stop_atr or take_atr else None
+        stop_loss, take_profit = calculate_exits(result.entry_price, atr=atr, stop_atr=stop_atr, take_atr=take_atr)
+        result.stop_loss, result.take_profit = float(stop_loss), float(take_profit)
+        result.risk_reward = calculate_risk_reward(result.entry_price, result.stop_loss, result.take_profit)
+    lap('signal')
+
+    return result
+
+
+def _analyze_packed(symbol, packed, min_confirmations, exits):
+    """Worker entry point rebuilding the candles from packed arrays"""
+    return analyze(symbol, Candles(**packed), min_confirmations, **exits)
+
+
+def submit_analysis(executor, symbol, data, min_confirmations=3, **exits):
+    """Submit one symbol to an executor (e.g. a ProcessPoolExecutor)"""
+    return executor.submit(_analyze_packed, symbol, pack_candles(data), min_confirmations, exits)
+
+
+def analyze_many(items, executor, min_confirmations=3, **exits):
+    """Analyze (symbol, DataFrame) pairs on an executor, yielding results as they complete"""
+    futures = [submit_analysis(executor, symbol, data, min_confirmations, **exits) for symbol, data in items]
+    for future in as_completed(futures):
+        yield future.result()
+
+
+def closed_candles(data, now=None):
+    """data without its last candle while that one is still forming at now (epoch seconds)"""
+    now = time.time() if now is None else now
+    if len(data) and int(data['close_time'].iloc[-1]) >= now * 1000:
+        return data.slice(0, len(data) - 1) if isinstance(data, Candles) else data.iloc[:-1]
+    return data
+
+
+class AnalysisCache:
+    """LRU cache of SignalResults keyed on the candles and parameters they came from
+
+    analyze() is a pure function of the candles, so candles ending at the
+    same closed candle get the same result. Only closed candles may be
+    cached (see closed_candles): their history no longer changes, so the
+    last close time identifies them. Hits and misses are counted here and
+    in the shared metrics.
+    """
+
+    def __init__(self, size=1024):
+        self.size = size
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(symbol, interval, data, **params):
+        """Cache key of analyzing closed candles with params (analyze's keyword arguments)"""
+        return (symbol, interval, int(data['close_time'].iloc[-1]), hash(tuple(sorted(params.items()))))
+
+    def get(self, key):
+        """The cached result of key, or None"""
+        with self.lock:
+            result = self.results.get(key)
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.results.move_to_end(key)
+        metrics.count('analysis_cache_misses' if result is None else 'analysis_cache_hits', key[0])
+        return result
+
+    def put(self, key, result):
+        with self.lock:
+            self.results[key] = result
+            self.results.move_to_end(key)
+            while len(self.results) > self.size:
+                self.results.popitem(last=False)
+
+    def stats(self):
+        """Hits, misses, hit rate and number of cached results"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'size': len(self.results)
+            }
@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+
+from analysis import pack_candles
+from indicators import calculate_sma, calculate_rsi, calculate_macd
+from candlestick_patterns import scan_candlesticks
+from support_resistance import calculate_support, calculate_resistance
+from risk_reward import calculate_risk_reward
+from data_fetcher import MAX_KLINES
+
+# Candles each candlestick pattern looks back over besides its own
+PATTERN_LAGS = {'bullish_engulfing': 1, 'hammer': 0, 'morning_star': 2, 'shooting_star': 0, 'hanging_man': 0}
+
+# Replays the confirmation rules of analysis.analyze() over a whole history.
+# Every rule is evaluated for every candle at once as a NumPy array, using only
+# data available at that candle's close. Long trades are opened on bullish
+# confirmed signals and closed by the stop loss or take profit.
+#
+# Both entry points accept a cache dict. Indicator arrays are stored in it
+# keyed by the parameters they depend on, so runs that only differ in
+# thresholds or exits reuse the same computations. Only the signals of the
+# latest rule set are kept, callers sweeping many rule sets should sort them
+# so runs sharing signals come one after another.
+
+
+def _cached(cache, key, compute):
+    """Return cache[key], computing and storing it on first use"""
+    if cache is None:
+        return compute()
+    if key not in cache:
+        cache[key] = compute()
+    return cache[key]
+
+
+def _levels_as_of(levels, n, window):
+    """Latest support/resistance level known at each candle's close
+
+    A level at candle i needs the candles up to i + window - 1, and the live
+    analysis only sees levels up to window candles back from the last close.
+    """
+    full = np.full(n, np.nan)
+    full[window:window + len(levels)] = levels.to_numpy()
+    known = pd.Series(full).ffill().shift(window)
+    return known.to_numpy()
+
+
+def _seen_in_buffer(masks, depth):
+    """Whether each pattern was found anywhere in the depth candles ending at each candle
+
+    analyze() reports a pattern found anywhere in its candle buffer. A
+    pattern looking lag candles back can't be found on the buffer's first
+    lag candles, so its window is shortened by lag.
+    """
+    return {
+        name: pd.Series(masks[name]).rolling(depth - lag, min_periods=1).max().to_numpy().astype(bool)
+        for name, lag in PATTERN_LAGS.items()
+    }
+
+
+def compute_signals(data, sma_period=14, rsi_period=14, rsi_oversold=30, rsi_overbought=70,
+                    macd_fast=12, macd_slow=26, macd_signal=9, sr_window=5, min_confirmations=3,
+                    buffer_depth=MAX_KLINES, cache=None):
+    """Evaluate the signal rules on every candle
+
+    buffer_depth is the number of candles the live bot analyzes, which the
+    candlestick rule looks back over. Returns a DataFrame with the number of confirmations, the direction of the
+    last confirming rule (1 up, -1 down, 0 none) and whether a long entry
+    signal fires on each candle.
+    """
+    candles = _cached(cache, 'candles', lambda: pd.DataFrame(pack_candles(data)))
+    close = candles['close'].to_numpy()
+    n = len(close)
+
+    sma = _cached(cache, ('sma', sma_period),
+                  lambda: calculate_sma(candles, period=sma_period).reindex(candles.index).to_numpy())
+    rsi = _cached(cache, ('rsi', rsi_period), lambda: calculate_rsi(candles, period=rsi_period).to_numpy())
+    macd = _cached(cache, ('macd', macd_fast, macd_slow, macd_signal),
+                   lambda: calculate_macd(candles, macd_fast, macd_slow, macd_signal))
+    macd_line = macd['macd_line'].to_numpy()
+    signal_line = macd['signal_line'].to_numpy()
+    previous_macd = np.r_[np.nan, macd_line[:-1]]
+    previous_signal = np.r_[np.nan, signal_line[:-1]]
+
+    masks = _cached(cache, ('candlesticks', buffer_depth),
+                    lambda: _seen_in_buffer(scan_candlesticks(candles)['masks'], buffer_depth))
+    bullish_candle = masks['bullish_engulfing'] | masks['hammer'] | masks['morning_star']
+    bearish_candle = masks['shooting_star'] | masks['hanging_man']
+
+    support = _cached(cache, ('support', sr_window),
+                      lambda: _levels_as_of(calculate_support(candles, sr_window), n, sr_window))
+    resistance = _cached(cache, ('resistance', sr_window),
+                         lambda: _levels_as_of(calculate_resistance(candles, sr_window), n, sr_window))
+    has_levels = ~np.isnan(support) & ~np.isnan(resistance)
+
+    # (up, down) for each rule, in the order analyze() applies them
+    rules = [
+        (close > sma, close < sma),
+        (rsi < rsi_oversold, rsi > rsi_overbought),
+        ((macd_line > signal_line) & (previous_macd < previous_signal),
+         (macd_line < signal_line) & (previous_macd > previous_signal)),
+        (bullish_candle, bearish_candle),
+        (has_levels & (close > resistance), has_levels & (close < support)),
+    ]
+
+    confirmations = np.zeros(n, dtype=np.int64)
+    direction = np.zeros(n, dtype=np.int64)
+    for up, down in rules:
+        down = down & ~up
+        confirmations += up | down
+        direction = np.where(up, 1, np.where(down, -1, direction))
+
+    return pd.DataFrame({
+        'confirmations': confirmations,
+        'direction': direction,
+        'entry': (confirmations >= min_confirmations) & (direction == 1)
+    }, index=data.index)
+
+
+def _first_exit(low, high, start, stop_loss, take_profit):
+    """Position of the first candle from start touching a stop, or -1
+
+    Searches windows of doubling size, so nearby exits stay cheap without
+    scanning the rest of the history.
+    """
+    size = 64
+    while start < len(low):
+        end = min(start + size, len(low))
+        hits = np.flatnonzero((low[start:end] <= stop_loss) | (high[start:end] >= take_profit))
+        if len(hits):
+            return start + hits[0]
+        start, size = end, size * 2
+    return -1
+
+
+def run_backtest(data, stop_loss_pct=0.02, take_profit_pct=0.05, signals=None, cache=None, **rules):
+    """Backtest long trades on the signal rules over a kline history
+
+    Trades enter at the close of a signal candle, one position at a time, and
+    exit at the stop loss or take profit price. When a candle touches both,
+    the stop loss is assumed to fill first. A trade still open at the end is
+    closed at the last close. Extra keyword arguments go to compute_signals().
+
+    Returns {'trades': DataFrame, 'summary': dict}.
+    """
+    candles = _cached(cache, 'candles', lambda: pd.DataFrame(pack_candles(data)))
+    close, high, low = (candles[column].to_numpy() for column in ('close', 'high', 'low'))
+    if signals is None:
+        key = tuple(sorted(rules.items()))
+        latest = cache.get('signals') if cache is not None else None
+        if latest is None or latest[0] != key:
+            latest = (key, compute_signals(data, cache=cache, **rules))
+            if cache is not None:
+                cache['signals'] = latest
+        signals = latest[1]
+    entries = np.flatnonzero(signals['entry'].to_numpy())
+
+    trades = []
+    position = 0
+    while True:
+        # Next signal after the previous trade was closed
+        position = np.searchsorted(entries, position)
+        if position >= len(entries):
+            break
+        entry = entries[position]
+        entry_price = close[entry]
+        stop_loss = entry_price * (1 - stop_loss_pct)
+        take_profit = entry_price * (1 + take_profit_pct)
+
+        exit_index = _first_exit(low, high, entry + 1, stop_loss, take_profit)
+        if exit_index < 0:
+            exit_index, exit_price, outcome = len(close) - 1, close[-1], 'open'
+        elif low[exit_index] <= stop_loss:
+            exit_price, outcome = stop_loss, 'stop_loss'
+        else:
+            exit_price, outcome = take_profit, 'take_profit'
+
+        trades.append({
+            'entry_index': entry,
+            'exit_index': exit_index,
+            'entry_price': entry_price,
+            'stop_loss': stop_loss,
+            'take_profit': take_profit,
+            'risk_reward': calculate_risk_reward(entry_price, stop_loss, take_profit),
+            'exit_price': exit_price,
+            'outcome': outcome,
+            'return': exit_price / entry_price - 1
+        })
+        position = exit_index + 1
+
+    trades = pd.DataFrame(trades, columns=[
+        'entry_index', 'exit_index', 'entry_price', 'stop_loss', 'take_profit',
+        'risk_reward', 'exit_price', 'outcome', 'return'
+    ])
+    if 'timestamp' in data:
+        timestamps = np.asarray(data['timestamp'])
+        trades.insert(1, 'entry_time', timestamps[trades['entry_index'].to_numpy(dtype=np.intp)])
+        trades.insert(3, 'exit_time', timestamps[trades['exit_index'].to_numpy(dtype=np.intp)])
+
+    return {'trades': trades, 'summary': summarize_trades(trades)}
+
+
+def summarize_trades(trades):
+    """Win rate, PnL and drawdown of a trades table, compounding each trade"""
+    returns = trades['return'].to_numpy(dtype=np.float64)
+    equity = np.cumprod(1 + returns)
+    peaks = np.maximum.accumulate(np.r_[1.0, equity])[1:]
+    wins = int((returns > 0).sum())
+
+    return {
+        'trades': len(returns),
+        'wins': wins,
+        'losses': int((returns < 0).sum()),
+        'win_rate': wins / len(returns) if len(returns) else None,
+        'total_return': float(equity[-1] - 1) if len(returns) else 0.0,
+        'average_return': float(returns.mean()) if len(returns) else None,
+        'max_drawdown': float((1 - equity / peaks).max()) if len(returns) else 0.0
+    }
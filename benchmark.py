@@ -0,0 +1,177 @@
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import indicators
+import candlestick_patterns
+import chart_patterns
+import support_resistance
+import panel_indicators
+from analysis import analyze
+
+# Benchmarks every public analysis function on synthetic OHLCV data built
+# from a fixed seed, plus the full per-symbol analysis main.py runs. Results
+# can be saved as a baseline and later runs compared against it, e.g.
+#
+#   python benchmark.py --save baseline.json
+#   python benchmark.py --compare baseline.json --threshold 0.2
+
+
+def synthetic_candles(bars, seed=0):
+    """Random-walk 1m klines shaped like the DataFrames fetch_historical_data returns"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, bars)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.002, bars))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.002, bars))
+    open_time = 1_700_000_000_000 + np.arange(bars, dtype=np.int64) * 60_000
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(open_time, unit='ms'),
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': rng.uniform(1, 100, bars),
+        'close_time': open_time + 59_999,
+        'quote_asset_volume': rng.uniform(100, 10_000, bars)
+    })
+
+
+# Per-symbol cases: name -> function of one kline DataFrame
+SYMBOL_CASES = {
+    'indicators.calculate_sma': lambda df: indicators.calculate_sma(df, period=14),
+    'indicators.calculate_ema': indicators.calculate_ema,
+    'indicators.calculate_rsi': indicators.calculate_rsi,
+    'indicators.calculate_macd': indicators.calculate_macd,
+    'indicators.calculate_stochastic': indicators.calculate_stochastic,
+    'indicators.calculate_fibonacci': indicators.calculate_fibonacci,
+    'candlestick_patterns.detect_doji': candlestick_patterns.detect_doji,
+    'candlestick_patterns.detect_engulfing': candlestick_patterns.detect_engulfing,
+    'candlestick_patterns.detect_hammer': candlestick_patterns.detect_hammer,
+    'candlestick_patterns.detect_hanging_man': candlestick_patterns.detect_hanging_man,
+    'candlestick_patterns.detect_morning_star': candlestick_patterns.detect_morning_star,
+    'candlestick_patterns.detect_inverted_hammer': candlestick_patterns.detect_inverted_hammer,
+    'candlestick_patterns.detect_shooting_star': candlestick_patterns.detect_shooting_star,
+    'candlestick_patterns.scan_candlesticks': candlestick_patterns.scan_candlesticks,
+    'chart_patterns.find_swing_points': chart_patterns.find_swing_points,
+    'chart_patterns.detect_head_and_shoulders': chart_patterns.detect_head_and_shoulders,
+    'chart_patterns.detect_triangle': chart_patterns.detect_triangle,
+    'chart_patterns.detect_double_top': chart_patterns.detect_double_top,
+    'chart_patterns.detect_double_bottom': chart_patterns.detect_double_bottom,
+    'support_resistance.calculate_support': support_resistance.calculate_support,
+    'support_resistance.calculate_resistance': support_resistance.calculate_resistance,
+    'support_resistance.calculate_support_resistance': support_resistance.calculate_support_resistance,
+    'support_resistance.clustered_levels': lambda df: support_resistance.calculate_support_resistance(df, clustered=True),
+    'analysis.analyze': lambda df: analyze('BENCH_USDT', df),
+}
+
+# Multi-symbol cases: name -> function of a list of kline DataFrames
+PANEL_CASES = {
+    'analysis.analyze (per symbol)': lambda frames: [analyze('BENCH_USDT', df) for df in frames],
+    'panel_indicators (all)': lambda frames: _run_panel(frames),
+}
+
+
+def _run_panel(frames):
+    panel = {column: np.vstack([df[column].to_numpy() for df in frames]) for column in ('high', 'low', 'close')}
+    panel_indicators.calculate_sma_panel(panel['close'], 14)
+    panel_indicators.calculate_ema_panel(panel['close'])
+    panel_indicators.calculate_rsi_panel(panel['close'])
+    panel_indicators.calculate_macd_panel(panel['close'])
+    panel_indicators.calculate_stochastic_panel(panel['high'], panel['low'], panel['close'])
+    panel_indicators.calculate_fibonacci_panel(panel['high'], panel['low'])
+
+
+def measure(function, argument, rows, repeat):
+    """Best wall time over repeat runs, throughput in rows/s and peak traced memory"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(argument)
+        timings.append(time.perf_counter() - start)
+
+    # Memory is traced on a separate run, tracing slows the timed ones down
+    tracemalloc.start()
+    function(argument)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    seconds = min(timings)
+    return {'seconds': seconds, 'rows_per_second': rows / seconds if seconds else None, 'peak_bytes': peak}
+
+
+def run(bar_sizes, symbol_counts, panel_bars=1000, repeat=3, seed=42):
+    """Run every case and return {case key: measurement}"""
+    results = {}
+    for bars in bar_sizes:
+        df = synthetic_candles(bars, seed)
+        for name, function in SYMBOL_CASES.items():
+            key = f"{name}[{bars} bars]"
+            results[key] = measure(function, df, bars, repeat)
+            print(_format(key, results[key]))
+
+    for count in symbol_counts:
+        frames = [synthetic_candles(panel_bars, seed + i) for i in range(count)]
+        for name, function in PANEL_CASES.items():
+            key = f"{name}[{count} symbols x {panel_bars} bars]"
+            results[key] = measure(function, frames, count * panel_bars, repeat)
+            print(_format(key, results[key]))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Cases slower than the baseline by more than threshold (relative)"""
+    regressions = []
+    for key, result in results.items():
+        if key in baseline and baseline[key]['seconds']:
+            change = result['seconds'] / baseline[key]['seconds'] - 1
+            if change > threshold:
+                regressions.append((key, baseline[key]['seconds'], result['seconds'], change))
+    return regressions
+
+
+def _format(key, result):
+    return (f"{key:<75} {result['seconds'] * 1000:>10.2f} ms {result['rows_per_second'] or 0:>14,.0f} rows/s "
+            f"{result['peak_bytes'] / 2 ** 20:>9.1f} MiB")
+
+
+def _sizes(text):
+    return [int(size) for size in text.split(",") if size]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the analysis modules")
+    parser.add_argument('--bars', type=_sizes, default=[1_000, 100_000, 1_000_000], help="comma separated history lengths")
+    parser.add_argument('--symbols', type=_sizes, default=[1, 100, 1000], help="comma separated symbol counts")
+    parser.add_argument('--panel-bars', type=int, default=1000, help="history length of every symbol in the multi-symbol cases")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--save', help="write the results to this baseline JSON file")
+    parser.add_argument('--compare', help="baseline JSON file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed slowdown before a case counts as a regression")
+    args = parser.parse_args(argv)
+
+    results = run(args.bars, args.symbols, args.panel_bars, args.repeat, args.seed)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for key, before, after, change in regressions:
+            print(f"REGRESSION {key}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms (+{change:.0%})")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from candles import Candles, numeric_column
+from data_fetcher import INTERVAL_SECONDS, MAX_KLINES, request_klines
+
+# Fixed-width column files kept for every symbol and interval
+STORE_COLUMNS = {
+    'timestamp': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+    'close_time': np.int64,
+    'quote_asset_volume': np.float64
+}
+
+
+def _to_milliseconds(value):
+    """Convert a timestamp (ms int, string or datetime) to epoch milliseconds"""
+    if value is None:
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(pd.Timestamp(value).value // 1_000_000)
+
+
+def _klines_to_columns(klines):
+    """Turn raw MEXC kline rows, a kline DataFrame or Candles into typed column arrays"""
+    if not isinstance(klines, (pd.DataFrame, Candles)):
+        klines = pd.DataFrame(klines, columns=list(STORE_COLUMNS))
+    columns = {}
+    for column, dtype in STORE_COLUMNS.items():
+        if pd.api.types.is_datetime64_any_dtype(klines[column]):
+            columns[column] = klines[column].to_numpy().astype('datetime64[ms]').astype(np.int64)
+        else:
+            columns[column] = numeric_column(klines, column, dtype)
+    return columns
+
+
+class CandleStore:
+    """On-disk candle history, one append-only file per column
+
+    Candles live under root/SYMBOL/INTERVAL/ as raw little-endian arrays of a
+    fixed width, so appending is a plain write and reading memory-maps the
+    files and returns NumPy views without copying or parsing anything.
+    """
+
+    def __init__(self, root='candles'):
+        self.root = root
+
+    def _directory(self, symbol, interval):
+        return os.path.join(self.root, symbol.replace("_", ""), interval)
+
+    def _path(self, symbol, interval, column):
+        return os.path.join(self._directory(symbol, interval), f"{column}.bin")
+
+    def __len__(self):
+        return sum(self.length(symbol, interval) for symbol, interval in self.series())
+
+    def series(self):
+        """List the (symbol, interval) pairs held by the store"""
+        if not os.path.isdir(self.root):
+            return []
+        return [
+            (symbol, interval)
+            for symbol in sorted(os.listdir(self.root))
+            for interval in sorted(os.listdir(os.path.join(self.root, symbol)))
+        ]
+
+    def length(self, symbol, interval='1m'):
+        """Number of complete candles stored"""
+        lengths = []
+        for column, dtype in STORE_COLUMNS.items():
+            path = self._path(symbol, interval, column)
+            lengths.append(os.path.getsize(path) // np.dtype(dtype).itemsize if os.path.exists(path) else 0)
+        return min(lengths)
+
+    def last_timestamp(self, symbol, interval='1m'):
+        """Open time (ms) of the newest stored candle, or None"""
+        timestamps = self.read(symbol, interval)['timestamp']
+        return int(timestamps[-1]) if len(timestamps) else None
+
+    def append(self, symbol, interval, klines):
+        """Append klines newer than the last stored candle, returning how many were written"""
+        columns = _klines_to_columns(klines)
+        last = self.last_timestamp(symbol, interval)
+        if last is not None:
+            newer = columns['timestamp'] > last
+            columns = {column: values[newer] for column, values in columns.items()}
+        count = len(columns['timestamp'])
+        if not count:
+            return 0
+
+        os.makedirs(self._directory(symbol, interval), exist_ok=True)
+        length = self.length(symbol, interval)
+        for column, dtype in STORE_COLUMNS.items():
+            with open(self._path(symbol, interval, column), 'ab') as f:
+                # Drop any partial write left behind by an interrupted append
+                f.truncate(length * np.dtype(dtype).itemsize)
+                f.write(columns[column].astype(dtype).tobytes())
+        return count
+
+    def insert(self, symbol, interval, klines):
+        """Store klines anywhere in the series, returning how many new candles were written
+
+        Klines newer than the last stored candle are appended. Older ones
+        (backfill before the first candle or into gaps) make the series be
+        merged and rewritten; candles already stored are kept as they are.
+        """
+        columns = _klines_to_columns(klines)
+        last = self.last_timestamp(symbol, interval)
+        if last is None or not len(columns['timestamp']) or columns['timestamp'].min() > last:
+            return self.append(symbol, interval, klines)
+
+        stored = self.read(symbol, interval)
+        timestamps = np.concatenate([stored['timestamp'], columns['timestamp']])
+        # Stable sort of stored-then-new rows, so the stored one wins a duplicate
+        order = np.argsort(timestamps, kind='stable')
+        unique = np.r_[True, np.diff(timestamps[order]) > 0]
+        keep = order[unique]
+        count = len(keep) - len(stored['timestamp'])
+        if not count:
+            return 0
+        self._rewrite(symbol, interval, {
+            column: np.concatenate([stored[column], columns[column].astype(dtype)])[keep]
+            for column, dtype in STORE_COLUMNS.items()
+        })
+        return count
+
+    def _rewrite(self, symbol, interval, columns):
+        """Replace every column file, writing them aside first"""
+        for column, dtype in STORE_COLUMNS.items():
+            path = self._path(symbol, interval, column)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(np.asarray(columns[column], dtype=dtype).tobytes())
+        for column in STORE_COLUMNS:
+            path = self._path(symbol, interval, column)
+            os.replace(path + '.tmp', path)
+
+    def gaps(self, symbol, interval='1m', start=None, end=None):
+        """(first, last) open times (ms) of the candles missing between start and end
+
+        Covers missing candles before the first stored one (from start),
+        between stored ones and after the last one (up to end, default now).
+        """
+        period = INTERVAL_SECONDS[interval] * 1000
+        start = _to_milliseconds(start)
+        end = _to_milliseconds(end) if end is not None else int(time.time() * 1000)
+        timestamps = np.asarray(self.read(symbol, interval)['timestamp'])
+        if not len(timestamps):
+            return [(start, end)] if start is not None and start <= end else []
+
+        ranges = []
+        if start is not None and start < timestamps[0]:
+            ranges.append((start, min(int(timestamps[0]) - period, end)))
+        for i in np.flatnonzero(np.diff(timestamps) > period):
+            first, last = int(timestamps[i]) + period, int(timestamps[i + 1]) - period
+            if start is not None and last >= start and first <= end:
+                ranges.append((max(first, start), min(last, end)))
+        if int(timestamps[-1]) + period <= end:
+            ranges.append((int(timestamps[-1]) + period, end))
+        return [(first, last) for first, last in ranges if first <= last]
+
+    def read(self, symbol, interval='1m', start=None, end=None):
+        """Memory-mapped column views of the candles opened in [start, end]"""
+        length = self.length(symbol, interval)
+        columns = {}
+        for column, dtype in STORE_COLUMNS.items():
+            if length:
+                columns[column] = np.memmap(self._path(symbol, interval, column), dtype=dtype, mode='r', shape=(length,))
+            else:
+                columns[column] = np.empty(0, dtype=dtype)
+
+        timestamps = columns['timestamp']
+        first = 0 if start is None else np.searchsorted(timestamps, _to_milliseconds(start), side='left')
+        last = length if end is None else np.searchsorted(timestamps, _to_milliseconds(end), side='right')
+        return {column: values[first:last] for column, values in columns.items()}
+
+    def to_frame(self, symbol, interval='1m', start=None, end=None):
+        """Read candles as a kline DataFrame like fetch_historical_data returns"""
+        df = pd.DataFrame({column: np.asarray(values) for column, values in self.read(symbol, interval, start, end).items()})
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+
+    def to_candles(self, symbol, interval='1m', start=None, end=None):
+        """Read candles as typed Candles viewing the mapped files without copying"""
+        return Candles(**self.read(symbol, interval, start, end))
+
+    def fill(self, symbol, interval='1m', start=None, end=None, session=None, base=None):
+        """Download missing closed candles from MEXC up to end (default now)
+
+        Always extends the series after its newest candle, or from start when
+        it is empty. With start, candles missing between start and the newest
+        stored one (before the first candle or in gaps) are filled too; gaps
+        MEXC has no candles for stay empty. Returns the number of candles added.
+        """
+        period = INTERVAL_SECONDS[interval] * 1000
+        end = _to_milliseconds(end) if end is not None else int(time.time() * 1000)
+        if start is None and self.last_timestamp(symbol, interval) is None:
+            raise ValueError("start is required to fill an empty series")
+
+        added = 0
+        for cursor, last in self.gaps(symbol, interval, start, end):
+            while cursor <= last:
+                rows = request_klines(symbol, interval, MAX_KLINES, start_time=cursor, end_time=last,
+                                      session=session, base=base)
+                # Only store candles that have closed
+                rows = [row for row in rows if int(row[6]) < end]
+                if not rows:
+                    break
+                added += self.insert(symbol, interval, rows)
+                cursor = int(rows[-1][0]) + period
+        return added
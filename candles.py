@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+# Column layout of a MEXC kline row and the dtype each column is stored as
+CANDLE_COLUMNS = {
+    'timestamp': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+    'close_time': np.int64,
+    'quote_asset_volume': np.float64
+}
+
+
+def numeric_column(data, column, dtype=np.float64):
+    """A column of a kline DataFrame or Candles as an array, coercing strings only when needed"""
+    if isinstance(data, Candles):
+        return np.asarray(getattr(data, column), dtype=dtype)
+    values = data[column]
+    if not pd.api.types.is_numeric_dtype(values):
+        values = pd.to_numeric(values, errors='coerce')
+    return np.asarray(values, dtype=dtype)
+
+
+class Candles:
+    """OHLCV candles held as contiguous, typed NumPy columns
+
+    A drop-in for the kline DataFrames the analysis modules take: data['close']
+    returns a Series viewing the float64 array without copying, len(), index
+    and `in` behave like a DataFrame, and assigning a column stores it as a
+    float64 array. Timestamps are int64 epoch milliseconds and come back from
+    data['timestamp'] as a datetime64[ms] view.
+    """
+
+    __slots__ = tuple(CANDLE_COLUMNS)
+
+    def __init__(self, **columns):
+        length = len(columns['close'])
+        for column, dtype in CANDLE_COLUMNS.items():
+            values = columns.get(column)
+            if values is None:
+                values = np.zeros(length, dtype=dtype)
+            setattr(self, column, np.ascontiguousarray(values, dtype=dtype))
+
+    @classmethod
+    def from_klines(cls, rows):
+        """Parse a raw MEXC kline payload straight into numeric columns"""
+        if not len(rows):
+            return cls(**{column: np.empty(0, dtype=dtype) for column, dtype in CANDLE_COLUMNS.items()})
+        # Epoch milliseconds are exact in float64, so one conversion parses every field
+        table = np.array(rows, dtype=np.float64)
+        return cls(**{column: table[:, i] for i, column in enumerate(CANDLE_COLUMNS)})
+
+    @classmethod
+    def from_frame(cls, data):
+        """Convert a kline DataFrame, coercing string columns once"""
+        if isinstance(data, cls):
+            return data
+        columns = {}
+        for column, dtype in CANDLE_COLUMNS.items():
+            if column not in data:
+                continue
+            if pd.api.types.is_datetime64_any_dtype(data[column]):
+                columns[column] = data[column].to_numpy().astype('datetime64[ms]').astype(np.int64)
+            else:
+                columns[column] = numeric_column(data, column, dtype)
+        return cls(**columns)
+
+    def __len__(self):
+        return len(self.close)
+
+    def __contains__(self, column):
+        return column in CANDLE_COLUMNS
+
+    def __getitem__(self, column):
+        if column not in CANDLE_COLUMNS:
+            raise KeyError(column)
+        values = getattr(self, column)
+        if column == 'timestamp':
+            values = values.view('datetime64[ms]')
+        return pd.Series(values, index=self.index, name=column, copy=False)
+
+    def __setitem__(self, column, values):
+        if column not in CANDLE_COLUMNS:
+            raise KeyError(column)
+        setattr(self, column, np.ascontiguousarray(values, dtype=CANDLE_COLUMNS[column]))
+
+    @property
+    def index(self):
+        return pd.RangeIndex(len(self))
+
+    @property
+    def columns(self):
+        return list(CANDLE_COLUMNS)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, column).nbytes for column in CANDLE_COLUMNS)
+
+    def __getstate__(self):
+        return {column: getattr(self, column) for column in CANDLE_COLUMNS}
+
+    def __setstate__(self, state):
+        for column, values in state.items():
+            setattr(self, column, values)
+
+    def tail(self, count):
+        """The last count candles, as views"""
+        return self.slice(max(len(self) - count, 0), len(self))
+
+    def slice(self, start, stop):
+        """Candles start:stop, as views"""
+        return Candles(**{column: getattr(self, column)[start:stop] for column in CANDLE_COLUMNS})
+
+    def merge(self, newer, depth=None):
+        """Candles with newer appended, replacing every candle it re-sends
+
+        Rows at or after newer's first open time are dropped first, so an
+        updated in-progress candle replaces its old version. Only the last
+        depth candles are kept.
+        """
+        if not len(newer):
+            return self
+        keep = np.searchsorted(self.timestamp, newer.timestamp[0], side='left')
+        start = max(keep + len(newer) - depth, 0) if depth else 0
+        return Candles(**{
+            column: np.concatenate([getattr(self, column)[start:keep], getattr(newer, column)[max(start - keep, 0):]])
+            for column in CANDLE_COLUMNS
+        })
+
+    def to_frame(self):
+        """A kline DataFrame with the same columns fetch_historical_data returns"""
+        df = pd.DataFrame({column: getattr(self, column) for column in CANDLE_COLUMNS})
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
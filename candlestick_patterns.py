@@ -1,13 +1,19 @@
+import numpy as np
 import pandas as pd
 
+from candles import numeric_column
+
+# Coerce columns to numbers in place, leaving already numeric ones untouched
+def _ensure_numeric(data, *columns):
+    for column in columns:
+        if not pd.api.types.is_numeric_dtype(data[column]):
+            data[column] = pd.to_numeric(data[column], errors='coerce')
+
 # Doji Candlestick Pattern
 def detect_doji(data):
     """Detect Doji Candlestick Pattern"""
     # Ensure the columns are numeric
-    data['open'] = pd.to_numeric(data['open'], errors='coerce')
-    data['close'] = pd.to_numeric(data['close'], errors='coerce')
-    data['high'] = pd.to_numeric(data['high'], errors='coerce')
-    data['low'] = pd.to_numeric(data['low'], errors='coerce')
+    _ensure_numeric(data, 'open', 'close', 'high', 'low')
     
     doji = (abs(data['open'] - data['close']) / (data['high'] - data['low'])) > 0.1
     return 'doji' if doji.any() else 'no_doji'
@@ -16,8 +22,7 @@ def detect_doji(data):
 def detect_engulfing(data):
     """Detect Bullish and Bearish Engulfing Candlestick Pattern"""
     # Ensure the columns are numeric
-    data['open'] = pd.to_numeric(data['open'], errors='coerce')
-    data['close'] = pd.to_numeric(data['close'], errors='coerce')
+    _ensure_numeric(data, 'open', 'close')
     
     bullish_engulfing = (data['close'] > data['open']) & (data['open'].shift(1) > data['close'].shift(1))
     bearish_engulfing = (data['close'] < data['open']) & (data['open'].shift(1) < data['close'].shift(1))
@@ -33,10 +38,7 @@ def detect_engulfing(data):
 def detect_hammer(data):
     """Detect Hammer Candlestick Pattern"""
     # Ensure the columns are numeric
-    data['open'] = pd.to_numeric(data['open'], errors='coerce')
-    data['close'] = pd.to_numeric(data['close'], errors='coerce')
-    data['high'] = pd.to_numeric(data['high'], errors='coerce')
-    data['low'] = pd.to_numeric(data['low'], errors='coerce')
+    _ensure_numeric(data, 'open', 'close', 'high', 'low')
     
     hammer = (data['high'] - data['low']) > 3 * (data['open'] - data['close'])  # Long shadow
     hammer &= (data['close'] - data['low']) < 0.33 * (data['high'] - data['low'])  # Small body
@@ -47,10 +49,7 @@ def detect_hammer(data):
 def detect_hanging_man(data):
     """Detect Hanging Man Candlestick Pattern"""
     # Ensure the columns are numeric
-    data['open'] = pd.to_numeric(data['open'], errors='coerce')
-    data['close'] = pd.to_numeric(data['close'], errors='coerce')
-    data['high'] = pd.to_numeric(data['high'], errors='coerce')
-    data['low'] = pd.to_numeric(data['low'], errors='coerce')
+    _ensure_numeric(data, 'open', 'close', 'high', 'low')
     
     hanging_man = (data['high'] - data['low']) > 3 * (data['open'] - data['close'])  # Long shadow
     hanging_man &= (data['close'] - data['low']) < 0.33 * (data['high'] - data['low'])  # Small body
@@ -61,8 +60,7 @@ def detect_hanging_man(data):
 def detect_morning_star(data):
     """Detect Morning Star Candlestick Pattern"""
     # Ensure the columns are numeric
-    data['open'] = pd.to_numeric(data['open'], errors='coerce')
-    data['close'] = pd.to_numeric(data['close'], errors='coerce')
+    _ensure_numeric(data, 'open', 'close')
     
     morning_star = ((data['close'].shift(2) < data['open'].shift(2))) & \
                    ((data['close'].shift(1) > data['open'].shift(1))) & \
@@ -73,10 +71,7 @@ def detect_morning_star(data):
 def detect_inverted_hammer(data):
     """Detect Inverted Hammer Candlestick Pattern"""
     # Ensure the columns are numeric
-    data['open'] = pd.to_numeric(data['open'], errors='coerce')
-    data['close'] = pd.to_numeric(data['close'], errors='coerce')
-    data['high'] = pd.to_numeric(data['high'], errors='coerce')
-    data['low'] = pd.to_numeric(data['low'], errors='coerce')
+    _ensure_numeric(data, 'open', 'close', 'high', 'low')
     
     inverted_hammer = (data['high'] - data['low']) > 3 * (data['open'] - data['close'])  # Long shadow
     inverted_hammer &= (data['high'] - data['close']) < 0.33 * (data['high'] - data['low'])  # Small body
@@ -87,12 +82,72 @@ def detect_inverted_hammer(data):
 def detect_shooting_star(data):
     """Detect Shooting Star Candlestick Pattern"""
     # Ensure the columns are numeric
-    data['open'] = pd.to_numeric(data['open'], errors='coerce')
-    data['close'] = pd.to_numeric(data['close'], errors='coerce')
-    data['high'] = pd.to_numeric(data['high'], errors='coerce')
-    data['low'] = pd.to_numeric(data['low'], errors='coerce')
+    _ensure_numeric(data, 'open', 'close', 'high', 'low')
     
     shooting_star = (data['high'] - data['low']) > 3 * (data['open'] - data['close'])  # Long shadow
     shooting_star &= (data['open'] - data['low']) < 0.33 * (data['high'] - data['low'])  # Small body
     shooting_star &= (data['close'] - data['low']) < 0.33 * (data['high'] - data['low'])  # Small body
     return 'shooting_star' if shooting_star.any() else 'no_shooting_star'
+
+
+def _shift(values, periods):
+    """Shift an array forward like Series.shift, filling the gap with NaN"""
+    shifted = np.empty_like(values)
+    shifted[:periods] = np.nan
+    shifted[periods:] = values[:-periods]
+    return shifted
+
+# All Candlestick Patterns in a single pass
+def scan_candlesticks(data):
+    """Detect every candlestick pattern in one pass without modifying the data
+
+    Returns a dict with a per-candle boolean mask for each pattern ('masks'),
+    whether each pattern is on the latest candle ('latest') and the result the
+    matching detect_* function reports for the whole frame ('results').
+    """
+    open_ = numeric_column(data, 'open')
+    close = numeric_column(data, 'close')
+    high = numeric_column(data, 'high')
+    low = numeric_column(data, 'low')
+
+    # Shared intermediates
+    body = open_ - close
+    candle_range = high - low
+    body_top = np.maximum(open_, close)
+    body_bottom = np.minimum(open_, close)
+    long_shadow = candle_range > 3 * body
+    small_body = 0.33 * candle_range
+    bullish = close > open_
+    bearish = close < open_
+    prev_open, prev_close = _shift(open_, 1), _shift(close, 1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        doji = (np.abs(body) / candle_range) > 0.1
+    hammer = long_shadow & ((body_top - low) < small_body)
+    inverted_hammer = long_shadow & ((high - body_bottom) < small_body)
+    morning_star = (_shift(close, 2) < _shift(open_, 2)) & (prev_close > prev_open) & bullish
+
+    masks = {
+        'doji': doji,
+        'bullish_engulfing': bullish & (prev_open > prev_close),
+        'bearish_engulfing': bearish & (prev_open < prev_close),
+        'hammer': hammer,
+        'hanging_man': hammer,
+        'morning_star': morning_star,
+        'inverted_hammer': inverted_hammer,
+        'shooting_star': hammer,
+    }
+    latest = {name: bool(mask[-1]) if len(mask) else False for name, mask in masks.items()}
+    found = {name: bool(mask.any()) for name, mask in masks.items()}
+
+    if found['bullish_engulfing']:
+        engulfing = 'bullish'
+    elif found['bearish_engulfing']:
+        engulfing = 'bearish'
+    else:
+        engulfing = 'no_engulfing'
+    results = {'engulfing': engulfing}
+    for name in ('doji', 'hammer', 'hanging_man', 'morning_star', 'inverted_hammer', 'shooting_star'):
+        results[name] = name if found[name] else f'no_{name}'
+
+    return {'masks': masks, 'latest': latest, 'results': results}
@@ -1,76 +1,125 @@
 import pandas as pd
 import numpy as np
 
+from candles import numeric_column
+
+# Positions of candles beating their neighbours on both sides
+def _pivots(values, left, right, compare):
+    n = len(values)
+    if n < left + right + 1:
+        return np.empty(0, dtype=np.intp)
+
+    centers = values[left:n - right]
+    mask = np.ones(len(centers), dtype=bool)
+    for offset in range(1, left + 1):
+        mask &= compare(centers, values[left - offset:n - right - offset])
+    for offset in range(1, right + 1):
+        mask &= compare(centers, values[left + offset:n - right + offset])
+    return np.flatnonzero(mask) + left
+
+# Swing Points shared by every chart pattern
+def find_swing_points(data, left=1, right=1):
+    """Find swing highs and swing lows
+
+    A swing high is a candle whose high is strictly above the highs of the
+    `left` candles before it and the `right` candles after it, a swing low the
+    reverse on the lows. Returns the high and low prices with the positional
+    indices of the pivots: {'high', 'low', 'highs', 'lows'}.
+    """
+    high = numeric_column(data, 'high')
+    low = numeric_column(data, 'low')
+    return {
+        'high': high,
+        'low': low,
+        'highs': _pivots(high, left, right, np.greater),
+        'lows': _pivots(low, left, right, np.less)
+    }
+
+# Slope of the line fitted through pivot prices, relative to their mean price
+def _trend(positions, prices):
+    slope = np.polyfit(positions, prices, 1)[0]
+    return slope * (positions[-1] - positions[0]) / np.mean(prices)
+
 # Head and Shoulders Pattern
-def detect_head_and_shoulders(data):
-    """Detect Head and Shoulders pattern"""
+def detect_head_and_shoulders(data, pivots=None):
+    """Detect Head and Shoulders pattern on the last three swing highs"""
+    if pivots is None:
+        pivots = find_swing_points(data)
     # We need at least 3 peaks for a valid Head and Shoulders pattern
-    if len(data) < 3:
+    if len(pivots['highs']) < 3:
         return 'no_head_and_shoulders'
 
-    left_shoulder = data['high'].iloc[0]
-    head = data['high'].iloc[1]
-    right_shoulder = data['high'].iloc[2]
+    left_shoulder, head, right_shoulder = pivots['high'][pivots['highs'][-3:]]
 
     if left_shoulder < head > right_shoulder:  # Head is higher than shoulders
         return 'head_and_shoulders'
     return 'no_head_and_shoulders'
 
 # Triangle Pattern (Symmetrical, Ascending, Descending)
-def detect_triangle(data):
-    """Detect Triangle chart pattern (Symmetrical, Ascending, Descending)"""
+def detect_triangle(data, pivots=None, points=3, tolerance=0.001):
+    """Detect Triangle chart pattern (Symmetrical, Ascending, Descending)
+
+    Trendlines are fitted through the last `points` swing highs and swing
+    lows. A line is flat when it moves less than `tolerance` (relative) over
+    its span.
+    """
     if len(data) < 5:
         return 'no_triangle'
 
-    highs = data['high'].iloc[-5:].reset_index(drop=True)  # Reset index
-    lows = data['low'].iloc[-5:].reset_index(drop=True)  # Reset index
+    if pivots is None:
+        pivots = find_swing_points(data)
+    highs = pivots['highs'][-points:]
+    lows = pivots['lows'][-points:]
+    if len(highs) < 2 or len(lows) < 2:
+        return 'no_triangle'
+
+    upper = _trend(highs, pivots['high'][highs])
+    lower = _trend(lows, pivots['low'][lows])
 
     # Ascending Triangle: Higher lows and flat tops
-    if all(lows[i] < lows[i+1] for i in range(len(lows)-1)) and all(highs[0] == highs[i] for i in range(1, len(highs))):
+    if lower > tolerance and abs(upper) <= tolerance:
         return 'ascending_triangle'
 
     # Descending Triangle: Lower highs and flat bottoms
-    if all(highs[i] > highs[i+1] for i in range(len(highs)-1)) and all(lows[0] == lows[i] for i in range(1, len(lows))):
+    if upper < -tolerance and abs(lower) <= tolerance:
         return 'descending_triangle'
 
     # Symmetrical Triangle: Both higher lows and lower highs
-    if all(lows[i] < lows[i+1] for i in range(len(lows)-1)) and all(highs[i] > highs[i+1] for i in range(len(highs)-1)):
+    if lower > tolerance and upper < -tolerance:
         return 'symmetrical_triangle'
 
     return 'no_triangle'
 
 # Double Top Pattern
-def detect_double_top(data):
+def detect_double_top(data, pivots=None):
     """Detect Double Top chart pattern"""
     if len(data) < 5:
         return 'no_double_top'
 
     # Check for two peaks at the top with a retracement in between
-    peaks = data['high'].rolling(window=3).apply(lambda x: x[1] > x[0] and x[1] > x[2], raw=True)
-    peaks = peaks.dropna().astype(int)
+    if pivots is None:
+        pivots = find_swing_points(data)
+    peaks = pivots['highs']
 
     # A valid Double Top pattern requires two peaks followed by a significant drop
-    if peaks.sum() == 2:
-        peak_indices = peaks.index[peaks == 1]
-        if len(peak_indices) == 2 and (data['high'][peak_indices[1]] < data['high'][peak_indices[0]]):
-            return 'double_top'
+    if len(peaks) == 2 and pivots['high'][peaks[1]] < pivots['high'][peaks[0]]:
+        return 'double_top'
 
     return 'no_double_top'
 
 # Double Bottom Pattern
-def detect_double_bottom(data):
+def detect_double_bottom(data, pivots=None):
     """Detect Double Bottom chart pattern"""
     if len(data) < 5:
         return 'no_double_bottom'
 
     # Check for two troughs at the bottom with a retracement in between
-    troughs = data['low'].rolling(window=3).apply(lambda x: x[1] < x[0] and x[1] < x[2], raw=True)
-    troughs = troughs.dropna().astype(int)
+    if pivots is None:
+        pivots = find_swing_points(data)
+    troughs = pivots['lows']
 
     # A valid Double Bottom pattern requires two troughs followed by a significant rise
-    if troughs.sum() == 2:
-        trough_indices = troughs.index[troughs == 1]
-        if len(trough_indices) == 2 and (data['low'][trough_indices[1]] > data['low'][trough_indices[0]]):
-            return 'double_bottom'
+    if len(troughs) == 2 and pivots['low'][troughs[1]] > pivots['low'][troughs[0]]:
+        return 'double_bottom'
 
     return 'no_double_bottom'
@@ -1,39 +1,274 @@
+import threading
+import time
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 import pandas as pd
+from requests.adapters import HTTPAdapter
+
+from candles import Candles
+from metrics import echo, metrics
 
 # MEXC API Base URL
 base_url = "https://api.mexc.com"
 
-def fetch_historical_data(symbol, interval='1m', limit=100):
-    """Fetch historical data from the MEXC API"""
-    endpoint = f"/api/v3/klines"
+# Column layout of a MEXC kline row
+KLINE_COLUMNS = [
+    'timestamp', 'open', 'high', 'low', 'close', 'volume',
+    'close_time', 'quote_asset_volume'
+]
+
+# Length of each MEXC kline interval in seconds
+INTERVAL_SECONDS = {
+    '1m': 60, '5m': 300, '15m': 900, '30m': 1800, '60m': 3600,
+    '4h': 14400, '1d': 86400, '1W': 604800, '1M': 2592000
+}
+
+# MEXC weeks start on Monday, the epoch (1970-01-01) was a Thursday
+WEEK_OFFSET = 4 * 86400 * 1000
+
+
+def interval_bounds(timestamp, interval):
+    """Open time and next open time (epoch ms) of the candle of interval containing timestamp (ms)
+
+    Weekly candles start on Monday and monthly ones on the first of the
+    calendar month (UTC), the rest are fixed multiples of INTERVAL_SECONDS.
+    """
+    timestamp = int(timestamp)
+    if interval == '1M':
+        moment = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
+        start = datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+        end = datetime(moment.year + moment.month // 12, moment.month % 12 + 1, 1, tzinfo=timezone.utc)
+        return int(start.timestamp() * 1000), int(end.timestamp() * 1000)
+    period = INTERVAL_SECONDS[interval] * 1000
+    offset = WEEK_OFFSET if interval == '1W' else 0
+    start = timestamp - (timestamp - offset) % period
+    return start, start + period
+
+
+# Largest number of klines MEXC returns per request
+MAX_KLINES = 1000
+
+# MEXC allows 500 weighted requests per 10 seconds per IP, stay well below it
+DEFAULT_RATE_LIMIT = 20
+
+_session = None
+_session_lock = threading.Lock()
+_rate_limiter = None
+
+
+class RateLimiter:
+    """Token bucket limiting the number of requests sent per second"""
+
+    def __init__(self, rate=DEFAULT_RATE_LIMIT, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def get_session(pool_size=16):
+    """Return the shared keep-alive session used for all MEXC requests"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def get_rate_limiter():
+    """Return the shared rate limiter every request to MEXC is counted against by default"""
+    global _rate_limiter
+    with _session_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter()
+        return _rate_limiter
+
+
+def parse_klines(data):
+    """Build a kline DataFrame from the raw MEXC payload"""
+    with metrics.timer('parse'):
+        df = pd.DataFrame(data, columns=KLINE_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    return df
+
+
+def parse_candles(data):
+    """Parse the raw MEXC payload straight into typed Candles"""
+    with metrics.timer('parse'):
+        return Candles.from_klines(data)
+
+
+def request_klines(symbol, interval='1m', limit=100, start_time=None, end_time=None, session=None, base=None, timeout=10):
+    """Request raw klines for one symbol, raising on HTTP or network errors"""
+    session = session or get_session()
     params = {
         'symbol': symbol.replace("_", ""),
         'interval': interval,
         'limit': limit
     }
+    if start_time is not None:
+        params['startTime'] = int(start_time)
+    if end_time is not None:
+        params['endTime'] = int(end_time)
+    with metrics.timer('fetch', symbol):
+        response = session.get((base or base_url) + "/api/v3/klines", params=params, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+
+def fetch_tickers(session=None, base=None, timeout=10):
+    """24h ticker statistics of every MEXC spot symbol in one request"""
+    session = session or get_session()
+    with metrics.timer('fetch_tickers'):
+        response = session.get((base or base_url) + "/api/v3/ticker/24hr", timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+
+def fetch_historical_data(symbol, interval='1m', limit=100):
+    """Fetch historical data from the MEXC API"""
     try:
-        response = requests.get(base_url + endpoint, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            # Check the structure of the data
-            print(data[:1])  # Output first item to inspect the structure
-            
-            # Ensure the data is in the correct format
-            # Adjust column names based on the returned data structure
-            df = pd.DataFrame(data, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume', 
-                'close_time', 'quote_asset_volume'
-            ])
-            
-            # Convert 'timestamp' to datetime
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            
-            # Return the data
-            return df
-        else:
-            print(f"Error fetching data: {response.status_code}")
-            return None
+        return parse_klines(request_klines(symbol, interval, limit))
+    except requests.exceptions.HTTPError as e:
+        echo(f"Error fetching data: {e.response.status_code}")
+        return None
     except requests.exceptions.RequestException as e:
-        print(f"Request failed: {e}")
+        echo(f"Request failed: {e}")
     return None
+
+
+def fetch_candles(symbol, interval='1m', limit=100, session=None, base=None):
+    """Fetch klines as typed Candles, raising on HTTP or network errors"""
+    return parse_candles(request_klines(symbol, interval, limit, session=session, base=base))
+
+
+def fetch_many(symbols, interval='1m', limit=100, max_workers=8, rate_limiter=None, session=None, base=None, typed=False):
+    """Fetch klines for many symbols concurrently over pooled connections
+
+    Returns a dict mapping each symbol to its DataFrame (Candles when typed),
+    or to the exception raised while fetching it.
+    """
+    session = session or get_session(pool_size=max_workers)
+    parse = parse_candles if typed else parse_klines
+
+    def fetch(symbol):
+        return parse(request_klines(symbol, interval, limit, session=session, base=base))
+
+    return _run_pooled(fetch, symbols, max_workers, rate_limiter)
+
+
+def _run_pooled(fetch, symbols, max_workers, rate_limiter):
+    """Run fetch(symbol) for every symbol on a rate limited thread pool"""
+    rate_limiter = rate_limiter or get_rate_limiter()
+
+    def run(symbol):
+        rate_limiter.acquire()
+        try:
+            return fetch(symbol)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(run, symbols)
+        return dict(zip(symbols, results))
+
+
+class CandleBuffer:
+    """Rolling kline buffer for one symbol and interval
+
+    After the first full load only klines opened since the last seen candle
+    are requested. The still-forming last candle is replaced by its newer
+    version and rows beyond depth are evicted from the front. With typed=True
+    the buffer holds Candles instead of a DataFrame.
+    """
+
+    def __init__(self, symbol, interval='1m', depth=MAX_KLINES, typed=False):
+        self.symbol = symbol
+        self.interval = interval
+        self.depth = depth
+        self.typed = typed
+        self.data = None
+        self.last_open_time = None
+        self.last_close_time = None
+
+    def merge(self, rows):
+        """Merge raw kline rows into the buffer and return the buffered candles"""
+        if not rows:
+            return self.data
+        if self.typed:
+            new = parse_candles(rows)
+            self.data = new.tail(self.depth) if self.data is None else self.data.merge(new, self.depth)
+        else:
+            new = parse_klines(rows)
+            if self.data is None:
+                combined = new
+            else:
+                kept = self.data[self.data['timestamp'] < new['timestamp'].iloc[0]]
+                combined = pd.concat([kept, new], ignore_index=True)
+            self.data = combined.iloc[-self.depth:].reset_index(drop=True)
+        self.last_open_time = int(rows[-1][0])
+        self.last_close_time = int(rows[-1][6])
+        return self.data
+
+    def refresh(self, session=None, base=None):
+        """Request the klines missing from the buffer and merge them"""
+        if self.last_open_time is not None:
+            rows = request_klines(self.symbol, self.interval, MAX_KLINES, start_time=self.last_open_time,
+                                  session=session, base=base)
+            if len(rows) < MAX_KLINES:
+                return self.merge(rows)
+        # Empty buffer, or too many candles missed to catch up in one request
+        self.data = None
+        rows = request_klines(self.symbol, self.interval, min(self.depth, MAX_KLINES), session=session, base=base)
+        return self.merge(rows)
+
+
+class KlineCache:
+    """Candle buffers keyed by (symbol, interval)"""
+
+    def __init__(self, depth=MAX_KLINES, typed=False):
+        self.depth = depth
+        self.typed = typed
+        self.buffers = {}
+
+    def get(self, symbol, interval='1m'):
+        """Return the buffer for symbol and interval, creating it if needed"""
+        key = (symbol, interval)
+        if key not in self.buffers:
+            self.buffers[key] = CandleBuffer(symbol, interval, self.depth, self.typed)
+        return self.buffers[key]
+
+    def refresh_many(self, symbols, interval='1m', max_workers=8, rate_limiter=None, session=None, base=None):
+        """Refresh the buffers of many symbols concurrently
+
+        Returns a dict mapping each symbol to its buffered DataFrame, or to
+        the exception raised while refreshing it.
+        """
+        session = session or get_session(pool_size=max_workers)
+        buffers = [self.get(symbol, interval) for symbol in symbols]
+
+        def refresh(buffer):
+            return buffer.refresh(session=session, base=base)
+
+        results = _run_pooled(refresh, buffers, max_workers, rate_limiter)
+        return {buffer.symbol: data for buffer, data in results.items()}
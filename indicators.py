@@ -45,6 +45,17 @@ def calculate_macd(data, fast_period=12, slow_period=26, signal_period=9):
     signal_line = macd_line.ewm(span=signal_period, adjust=False).mean()
     return {'macd_line': macd_line, 'signal_line': signal_line}
 
+# Average True Range (ATR)
+def calculate_atr(data, period=14):
+    """Calculate the Average True Range (ATR) with Wilder's smoothing"""
+    previous_close = data['close'].shift(1)
+    true_range = pd.concat([
+        data['high'] - data['low'],
+        (data['high'] - previous_close).abs(),
+        (data['low'] - previous_close).abs()
+    ], axis=1).max(axis=1)
+    return true_range.ewm(alpha=1 / period, adjust=False).mean()
+
 # Volume Analysis (Simple)
 def calculate_volume(data):
     """Simple Volume Analysis"""
@@ -64,8 +75,9 @@ def calculate_stochastic(data, k_period=14, d_period=3):
 def calculate_fibonacci(data):
     """Calculate Fibonacci retracement levels based on high and low of data"""
     # Ensure the 'high' and 'low' columns are numeric
-    data['high'] = pd.to_numeric(data['high'], errors='coerce')
-    data['low'] = pd.to_numeric(data['low'], errors='coerce')
+    for column in ('high', 'low'):
+        if not pd.api.types.is_numeric_dtype(data[column]):
+            data[column] = pd.to_numeric(data[column], errors='coerce')
     
     max_price = data['high'].max()
     min_price = data['low'].min()
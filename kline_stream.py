@@ -0,0 +1,150 @@
+import asyncio
+import json
+
+import requests
+import websockets
+
+from data_fetcher import KlineCache
+from metrics import echo, metrics
+
+# MEXC spot WebSocket endpoint (JSON channels)
+ws_url = "wss://wbs.mexc.com/ws"
+
+# MEXC allows 30 subscriptions per connection
+SUBSCRIPTIONS_PER_CONNECTION = 30
+
+# Kline interval names used by the WebSocket channels
+STREAM_INTERVALS = {
+    '1m': 'Min1', '5m': 'Min5', '15m': 'Min15', '30m': 'Min30', '60m': 'Min60',
+    '4h': 'Hour4', '1d': 'Day1', '1W': 'Week1', '1M': 'Month1'
+}
+
+
+def kline_channel(symbol, interval='1m'):
+    """Name of the kline channel for a symbol"""
+    return f"spot@public.kline.v3.api@{symbol.replace('_', '')}@{STREAM_INTERVALS[interval]}"
+
+
+class KlineStream:
+    """Real-time klines for many symbols over a few multiplexed WebSockets
+
+    Every push updates the symbol's CandleBuffer in the shared KlineCache,
+    replacing the in-progress candle. When a push opens a new candle the
+    previous one has closed and on_close(symbol, data) is called with the
+    buffered candles ending at the closed one. Malformed pushes are skipped
+    and failed handshakes retried like dropped connections. After each (re)connect the buffers are backfilled over
+    REST so no candle is lost while disconnected.
+    """
+
+    def __init__(self, symbols, interval='1m', on_close=None, cache=None, url=None,
+                 per_connection=SUBSCRIPTIONS_PER_CONNECTION, ping_interval=20, retry_interval=30, backfill=True,
+                 base=None):
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.on_close = on_close
+        self.cache = cache or KlineCache()
+        self.url = url
+        self.per_connection = per_connection
+        self.ping_interval = ping_interval
+        self.retry_interval = retry_interval
+        self.backfill = backfill
+        self.base = base
+        self.streams = {kline_channel(symbol, interval): symbol for symbol in self.symbols}
+        self.running = False
+
+    async def run(self):
+        """Open one connection per group of symbols and consume them until stopped"""
+        self.running = True
+        groups = [
+            self.symbols[start:start + self.per_connection]
+            for start in range(0, len(self.symbols), self.per_connection)
+        ]
+        await asyncio.gather(*(self._connection(group) for group in groups))
+
+    def stop(self):
+        self.running = False
+
+    async def _connection(self, symbols):
+        delay = 1
+        while self.running:
+            try:
+                async with websockets.connect(self.url or ws_url) as ws:
+                    await ws.send(json.dumps({
+                        'method': 'SUBSCRIPTION',
+                        'params': [kline_channel(symbol, self.interval) for symbol in symbols]
+                    }))
+                    if self.backfill:
+                        await asyncio.to_thread(self._backfill, symbols)
+                    delay = 1
+                    await self._receive(ws, symbols)
+            except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+                if not self.running:
+                    break
+                metrics.count('stream_disconnects')
+                echo(f"Kline stream disconnected ({e}), reconnecting in {delay}s...")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60)
+
+    async def _receive(self, ws, symbols):
+        pinger = asyncio.create_task(self._ping(ws))
+        loop = asyncio.get_running_loop()
+        retry_at = loop.time() + self.retry_interval
+        try:
+            while self.running:
+                try:
+                    message = await asyncio.wait_for(ws.recv(), timeout=1)
+                except asyncio.TimeoutError:
+                    message = None
+                if message is not None:
+                    try:
+                        self.handle(message)
+                    except (ValueError, KeyError, TypeError, AttributeError) as e:
+                        metrics.count('malformed_pushes')
+                        echo(f"Skipping malformed kline push ({e!r}): {message[:200]}")
+                if self.backfill and loop.time() >= retry_at:
+                    # Retry symbols whose backfill failed, their pushes are ignored until then
+                    missing = [symbol for symbol in symbols if self.cache.get(symbol, self.interval).data is None]
+                    if missing:
+                        await asyncio.to_thread(self._backfill, missing)
+                    retry_at = loop.time() + self.retry_interval
+        finally:
+            pinger.cancel()
+            await ws.close()
+
+    async def _ping(self, ws):
+        # MEXC drops connections that stay silent for a minute
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            await ws.send(json.dumps({'method': 'PING'}))
+
+    def _backfill(self, symbols):
+        for symbol in symbols:
+            try:
+                self.cache.get(symbol, self.interval).refresh(base=self.base)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                metrics.count('fetch_errors', symbol)
+                echo(f"Backfill failed for {symbol}: {e}")
+
+    def handle(self, message):
+        """Apply one pushed message to the candle buffers"""
+        message = json.loads(message)
+        symbol = self.streams.get(message.get('c'))
+        kline = message.get('d', {}).get('k')
+        if symbol is None or kline is None:
+            return  # Subscription acknowledgements and PONGs
+
+        buffer = self.cache.get(symbol, self.interval)
+        if self.backfill and buffer.data is None:
+            return  # No history yet, wait for the backfill
+        open_time = int(kline['t']) * 1000
+        previous_open_time = buffer.last_open_time
+        if previous_open_time is not None and open_time < previous_open_time:
+            return  # Late update for a candle already replaced
+
+        closed = buffer.data
+        buffer.merge([[
+            open_time, kline['o'], kline['h'], kline['l'], kline['c'], kline['v'],
+            int(kline['T']) * 1000 - 1, kline['a']
+        ]])
+        if previous_open_time is not None and open_time > previous_open_time and self.on_close:
+            self.on_close(symbol, closed)
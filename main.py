@@ -1,158 +1,194 @@
+import asyncio
 import time
-import pandas as pd
-from data_fetcher import fetch_historical_data
-from indicators import calculate_sma, calculate_rsi, calculate_macd, calculate_stochastic, calculate_fibonacci
-from candlestick_patterns import detect_doji, detect_engulfing, detect_hammer, detect_hanging_man, detect_morning_star, detect_inverted_hammer, detect_shooting_star
-from chart_patterns import detect_head_and_shoulders, detect_triangle, detect_double_top, detect_double_bottom
-from support_resistance import calculate_support_resistance
-from risk_reward import calculate_risk_reward
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import requests
+from data_fetcher import KlineCache, get_rate_limiter
+from analysis import AnalysisCache, analyze, closed_candles, submit_analysis
+from scheduler import CandleScheduler
+from kline_stream import KlineStream
+from scanner import Scanner
+from metrics import echo, metrics, set_quiet
+from resampler import MultiTimeframe, combine_confirmations
+from risk_reward import calculate_position_size, calculate_liquidation_price
 
 # Configuration
 symbols = [
     'BTC_USDT', 'ETH_USDT', 'BNB_USDT', 'XRP_USDT', "SOL_USDT", "DOGE_USDT", "PEPE_USDT", "SUI_USDT", "LINK_USDT", "SHIB_USDT", "SEI_USDT", "TRX_USDT"
 ]
-
-# Loop through each symbol (coin) in the list
-while True:
-    for symbol in symbols:
-        print(f"\n\u25B6 Monitoring {symbol}...")
-
-        # Fetch historical data (e.g., last 100 minutes of data)
-        historical_data = fetch_historical_data(symbol, interval='1m', limit=1000)
-
-        print()
-        if historical_data is not None:
-            print(f"Fetching Historical Data...")
-
-            # Convert the 'close' column to numeric to avoid issues with diff()
-            historical_data['close'] = pd.to_numeric(historical_data['close'], errors='coerce')
-
-            # Calculate indicators
-            sma = calculate_sma(historical_data, period=14)
-            rsi = calculate_rsi(historical_data)
-            macd, signal_line = calculate_macd(historical_data)
-            stochastic = calculate_stochastic(historical_data)
-            fibonacci_levels = calculate_fibonacci(historical_data)
-
-            # Detect candlestick patterns
-            doji = detect_doji(historical_data)
-            engulfing = detect_engulfing(historical_data)
-            hammer = detect_hammer(historical_data)
-            hanging_man = detect_hanging_man(historical_data)
-            morning_star = detect_morning_star(historical_data)
-            inverted_hammer = detect_inverted_hammer(historical_data)
-            shooting_star = detect_shooting_star(historical_data)
-
-            # Detect chart patterns
-            head_and_shoulders = detect_head_and_shoulders(historical_data)
-            triangle = detect_triangle(historical_data)
-            double_top = detect_double_top(historical_data)
-            double_bottom = detect_double_bottom(historical_data)
-
-            # Calculate support and resistance
-            support, resistance = calculate_support_resistance(historical_data)
-
-            # Check if a signal is confirmed by at least three conditions
-            signal_confirmations = 0
-            signal_reasons = []
-            signal_message = None  # Will indicate whether the price is going up or down
-
-            # SMA Confirmation
-            if len(sma) > 0:
-                if historical_data['close'].iloc[-1] > sma.iloc[-1]:
-                    signal_confirmations += 1
-                    signal_reasons.append("Price above SMA")
-                    signal_message = "Price likely to go up from here."
-                elif historical_data['close'].iloc[-1] < sma.iloc[-1]:
-                    signal_confirmations += 1
-                    signal_reasons.append("Price below SMA")
-                    signal_message = "Price likely to go down from here."
-
-            # RSI Confirmation
-            if len(rsi) > 0:
-                last_rsi_value = rsi.iloc[-1]
-                if last_rsi_value < 30:
-                    signal_confirmations += 1
-                    signal_reasons.append("RSI oversold")
-                    signal_message = "Price likely to go up from here."
-                elif last_rsi_value > 70:
-                    signal_confirmations += 1
-                    signal_reasons.append("RSI overbought")
-                    signal_message = "Price likely to go down from here."
-
-            # MACD Confirmation
-            if len(macd) > 0 and macd[-1] > signal_line[-1] and macd[-2] < signal_line[-2]:
-                signal_confirmations += 1
-                signal_reasons.append("Bullish MACD crossover")
-                signal_message = "Price likely to go up from here."
-            elif len(macd) > 0 and macd[-1] < signal_line[-1] and macd[-2] > signal_line[-2]:
-                signal_confirmations += 1
-                signal_reasons.append("Bearish MACD crossover")
-                signal_message = "Price likely to go down from here."
-
-            # Candlestick Patterns
-            if engulfing or hammer or morning_star:
-                signal_confirmations += 1
-                signal_reasons.append("Bullish candlestick pattern")
-                signal_message = "Price likely to go up from here."
-            elif shooting_star or hanging_man:
-                signal_confirmations += 1
-                signal_reasons.append("Bearish candlestick pattern")
-                signal_message = "Price likely to go down from here."
-
-            # Support/Resistance Breakout
-            if support is not None and resistance is not None:
-                try:
-                    support = float(support)
-                    resistance = float(resistance)
-                    if historical_data['close'].iloc[-1] > resistance:
-                        signal_confirmations += 1
-                        signal_reasons.append("Breakout above resistance")
-                        signal_message = "Price likely to go up from here."
-                    elif historical_data['close'].iloc[-1] < support:
-                        signal_confirmations += 1
-                        signal_reasons.append("Breakdown below support")
-                        signal_message = "Price likely to go down from here."
-                except ValueError:
-                    print(f"Invalid support or resistance value for {symbol}. Skipping breakout check.")
-
-            # Print Signal Summary
-            print(f"\n\u2501\u2501\u2501\u2501 SIGNAL SUMMARY FOR {symbol} \u2501\u2501\u2501\u2501")
-            for reason in signal_reasons:
-                print(f"- {reason}")
-
-            # Check if a signal is confirmed
-            if signal_confirmations >= 3:
-                print(f"\u2714 {signal_message} \u2714")
-
-                if "up" in signal_message:
-                    # Calculate Entry Price, Stop Loss, and Take Profit
-                    entry_price = historical_data['close'].iloc[-1]
-                    stop_loss = entry_price * 0.98  # Example: 2% below entry
-                    take_profit = entry_price * 1.05  # Example: 5% above entry
-
-                    print(f"Entry Price: {entry_price}")
-                    print(f"Stop Loss: {stop_loss}")
-                    print(f"Take Profit: {take_profit}")
-
-                    # Calculate Risk/Reward
-                    risk_reward_ratio = calculate_risk_reward(entry_price, stop_loss, take_profit)
-                    if risk_reward_ratio is not None:
-                        print(f"Risk/Reward Ratio: {risk_reward_ratio:.2f}")
-                    else:
-                        print(f"Risk/Reward ratio calculation failed for {symbol}.")
-
-                    print(f"\u23F3 Pausing for 80 seconds due to signal confirmation... \u23F3")
-                    time.sleep(80)
-                
-
+interval = '1m'
+signal_cooldown = 80  # Seconds a symbol is left alone after a confirmed signal
+analysis_workers = 4  # Processes running the analysis, 0 analyzes on the fetching thread
+ingestion = 'rest'  # 'rest' polls after each candle close, 'websocket' streams klines, 'scan' sweeps every USDT pair
+quiet = False  # Turn off the per-symbol console reports
+metrics_port = None  # Serve Prometheus metrics on this port, e.g. 9100
+metrics_log = None  # Append one JSON line per analyzed symbol to this file
+confirm_timeframes = []  # Higher timeframes resampled from the 1m candles, e.g. ['5m', '15m']
+min_timeframes = 2  # Timeframes (1m included) that must agree when confirm_timeframes is set
+exits = {}  # ATR-based exits instead of 2% / 5%, e.g. {'stop_atr': 1.5, 'take_atr': 3}
+account_equity = None  # Report a position size for signals when set (quote currency)
+risk_per_trade = 0.01  # Fraction of the equity lost at the stop
+leverage = 1  # Futures leverage used for the size cap and liquidation price
+scan_min_quote_volume = 500_000  # Scan mode: skip pairs with less 24h quote volume (USDT)
+scan_top = None  # Scan mode: only the most traded pairs, e.g. 300
+
+# Rolling candle buffers, only new candles are fetched after the first run
+kline_cache = KlineCache(depth=1000, typed=True)
+rate_limiter = get_rate_limiter()
+analysis_cache = AnalysisCache()  # Results of candles already analyzed and reported
+analysis_pool = None
+timeframes = {}  # Symbol -> MultiTimeframe
+
+
+def process_symbol(symbol, interval='1m', historical_data=None):
+    """Fetch, analyze and report one symbol, returning True when a signal is confirmed
+
+    Streamed candles are passed in as historical_data and skip the fetch.
+    """
+    # Collect the report and print it at once so concurrent symbols don't interleave
+    report = []
+    log = report.append
+    confirmed = False
+
+    log(f"\n\u25B6 Monitoring {symbol}...")
+
+    # Fetch historical data (e.g., last 1000 minutes of data)
+    if historical_data is None:
+        rate_limiter.acquire()
+        try:
+            historical_data = kline_cache.get(symbol, interval).refresh()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            metrics.count('fetch_errors', symbol)
+            log(f"Request failed: {e}")
+
+    log("")
+    if historical_data is not None:
+        # Signals come from closed candles, ones already analyzed were reported before
+        historical_data = closed_candles(historical_data)
+        if not len(historical_data):
+            log(f"No closed candles yet for {symbol}")
+            return False
+        key = analysis_cache.key(symbol, interval, historical_data, **exits)
+        if analysis_cache.get(key) is not None:
+            return False
+
+        log(f"Fetching Historical Data...")
+
+        with metrics.timer('analysis', symbol):
+            if analysis_pool is not None:
+                result = submit_analysis(analysis_pool, symbol, historical_data, **exits).result()
             else:
-                print(f"\u274C Signal not confirmed for {symbol}, no action taken. \u274C")
+                result = analyze(symbol, historical_data, **exits)
+        analysis_cache.put(key, result)
+
+        for stage, seconds in result.timings.items():
+            metrics.observe(stage, seconds, symbol)
+        metrics.count('analyzed', symbol)
+        if result.confirmed:
+            metrics.count('signals', symbol)
+        metrics.log({
+            'symbol': symbol,
+            'confirmations': result.confirmations,
+            'confirmed': result.confirmed,
+            'message': result.message,
+            'timings': result.timings
+        })
+
+        # Print Signal Summary
+        log(f"\n\u2501\u2501\u2501\u2501 SIGNAL SUMMARY FOR {symbol} \u2501\u2501\u2501\u2501")
+        for reason in result.reasons:
+            log(f"- {reason}")
+        signal_confirmed = result.confirmed
+
+        # Higher timeframe confirmation, resampled from the 1m candles without extra requests
+        if confirm_timeframes:
+            frames = timeframes.setdefault(symbol, MultiTimeframe(confirm_timeframes, cache=analysis_cache))
+            frames.update_from(historical_data)
+            combined = combine_confirmations({interval: result, **frames.analyze(symbol)}, min_timeframes)
+            log(f"- Timeframes agreeing: {', '.join(combined['timeframes']) or 'none'}")
+            signal_confirmed = signal_confirmed and combined['confirmed'] and combined['message'] == result.message
+
+        # Check if a signal is confirmed
+        if signal_confirmed:
+            log(f"\u2714 {result.message} \u2714")
+
+            if result.entry_price is not None:
+                log(f"Entry Price: {result.entry_price}")
+                log(f"Stop Loss: {result.stop_loss}")
+                log(f"Take Profit: {result.take_profit}")
+
+                if result.risk_reward is not None:
+                    log(f"Risk/Reward Ratio: {result.risk_reward:.2f}")
+                else:
+                    log(f"Risk/Reward ratio calculation failed for {symbol}.")
+
+                if account_equity:
+                    quantity = calculate_position_size(account_equity, result.entry_price, result.stop_loss, risk_per_trade, leverage)
+                    log(f"Position Size: {float(quantity):.6g} ({risk_per_trade:.1%} of equity at risk)")
+                    if leverage > 1:
+                        log(f"Liquidation Price ({leverage}x): {float(calculate_liquidation_price(result.entry_price, leverage)):.6g}")
+
+                log(f"\u23F3 Pausing {symbol} for {signal_cooldown} seconds due to signal confirmation... \u23F3")
+                confirmed = True
 
         else:
-            print(f"Failed to fetch data for {symbol}. Skipping...")
+            log(f"\u274C Signal not confirmed for {symbol}, no action taken. \u274C")
+
+    else:
+        log(f"Failed to fetch data for {symbol}. Skipping...")
+
+    echo("\n".join(report))
+    return confirmed
+
+
+def run_stream():
+    """Analyze each symbol as soon as the WebSocket stream closes one of its candles"""
+    executor = ThreadPoolExecutor(max_workers=8)
+    cooldowns = {}
+
+    def on_close(symbol, historical_data):
+        if cooldowns.get(symbol, 0) > time.time():
+            return
+        future = executor.submit(process_symbol, symbol, interval, historical_data)
+
+        def done(future):
+            if future.exception() is not None:
+                metrics.count('analysis_errors', symbol)
+                echo(f"Analysis failed for {symbol}: {future.exception()}")
+            elif future.result():
+                cooldowns[symbol] = time.time() + signal_cooldown
+
+        future.add_done_callback(done)
+
+    stream = KlineStream(symbols, interval, on_close=on_close, cache=kline_cache)
+    asyncio.run(stream.run())
+
+
+def main():
+    global analysis_pool
+    set_quiet(quiet)
+    if metrics_port:
+        metrics.serve(metrics_port)
+    if metrics_log:
+        metrics.open_log(metrics_log)
+    if analysis_workers:
+        analysis_pool = ProcessPoolExecutor(max_workers=analysis_workers)
+
+    if ingestion == 'websocket':
+        run_stream()
+        return
+
+    if ingestion == 'scan':
+        scanner = Scanner(process_symbol, interval, min_quote_volume=scan_min_quote_volume, top=scan_top,
+                          cooldown=signal_cooldown, cache=kline_cache, rate_limiter=rate_limiter)
+        scanner.run_forever()
+        return
+
+    scheduler = CandleScheduler(process_symbol, cooldown=signal_cooldown)
+    for symbol in symbols:
+        scheduler.add(symbol, interval)
+    scheduler.run_forever()
 
-        time.sleep(5)  # Wait 5 seconds before checking the next coin
 
-    print("\n\u23F3 Cycle complete. Waiting for 60 seconds before the next cycle. \u23F3\n")
-    time.sleep(60)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Latency samples kept per stage for percentiles
+WINDOW = 1024
+
+_quiet = False
+
+
+def set_quiet(quiet=True):
+    """Turn console output of the hot loop off (or back on)"""
+    global _quiet
+    _quiet = quiet
+
+
+def echo(*args, **kwargs):
+    """print() unless quiet mode is on"""
+    if not _quiet:
+        print(*args, **kwargs)
+
+
+class Metrics:
+    """Stage timers, counters and rolling latency percentiles
+
+    Timings use the monotonic perf_counter clock. Each stage keeps a
+    fixed-size window of samples for percentiles, while per symbol only a
+    count and a sum are kept, so memory stays flat with thousands of
+    symbols. Recording one costs an append; percentiles are computed when a
+    snapshot is taken, outside the lock the hot path records under.
+    """
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(lambda: deque(maxlen=self.window))
+        self.totals = defaultdict(lambda: [0, 0.0])
+        self.counters = defaultdict(int)
+        self.log_file = None
+
+    @contextmanager
+    def timer(self, stage, symbol=None):
+        """Time the enclosed block as one observation of stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, symbol)
+
+    def observe(self, stage, seconds, symbol=None):
+        """Record one duration (seconds) of stage"""
+        with self.lock:
+            self.latencies[stage].append(seconds)
+            for key in ((stage, None), (stage, symbol)) if symbol else ((stage, None),):
+                total = self.totals[key]
+                total[0] += 1
+                total[1] += seconds
+
+    def count(self, event, symbol=None, amount=1):
+        """Increment the counter of event"""
+        with self.lock:
+            self.counters[(event, None)] += amount
+            if symbol:
+                self.counters[(event, symbol)] += amount
+
+    def snapshot(self):
+        """Count and total of every stage (overall and per symbol), overall p50 and p99, plus all counters"""
+        with self.lock:
+            windows = {stage: list(values) for stage, values in self.latencies.items()}
+            totals = {key: tuple(total) for key, total in self.totals.items()}
+            counters = dict(self.counters)
+
+        percentiles = {
+            stage: np.percentile(np.array(values), [50, 99]) if values else (None, None)
+            for stage, values in windows.items()
+        }
+        stages = {}
+        for (stage, symbol), (count, seconds) in totals.items():
+            p50, p99 = percentiles[stage] if symbol is None else (None, None)
+            stages.setdefault(stage, {})[symbol or 'all'] = {
+                'count': count,
+                'total_seconds': seconds,
+                'p50': float(p50) if p50 is not None else None,
+                'p99': float(p99) if p99 is not None else None
+            }
+        events = {}
+        for (event, symbol), value in counters.items():
+            events.setdefault(event, {})[symbol or 'all'] = value
+        return {'time': time.time(), 'stages': stages, 'events': events}
+
+    def to_prometheus(self, prefix='cryptoshark'):
+        """Render the snapshot in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = [f"# TYPE {prefix}_stage_seconds summary"]
+        for stage, symbols in snapshot['stages'].items():
+            for symbol, values in symbols.items():
+                labels = f'stage="{stage}",symbol="{symbol}"'
+                for quantile in ('p50', 'p99'):
+                    if values[quantile] is not None:
+                        lines.append(f'{prefix}_stage_seconds{{{labels},quantile="0.{quantile[1:]}"}} {values[quantile]}')
+                lines.append(f"{prefix}_stage_seconds_count{{{labels}}} {values['count']}")
+                lines.append(f"{prefix}_stage_seconds_sum{{{labels}}} {values['total_seconds']}")
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for event, symbols in snapshot['events'].items():
+            for symbol, value in symbols.items():
+                lines.append(f'{prefix}_events_total{{event="{event}",symbol="{symbol}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def open_log(self, path):
+        """Append structured JSON lines records to path"""
+        self.log_file = open(path, 'a', buffering=1)
+
+    def log(self, record):
+        """Write one record to the JSON lines log, if one is open"""
+        if self.log_file is not None:
+            record = {'time': time.time(), **record}
+            with self.lock:
+                self.log_file.write(json.dumps(record, default=float) + "\n")
+
+    def serve(self, port=9100, host=''):
+        """Serve /metrics for Prometheus from a background thread"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+# Registry shared by the bot's modules
+metrics = Metrics()
@@ -0,0 +1,115 @@
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from analysis import pack_candles
+from backtest import run_backtest
+
+# Strategy parameters as hard-coded in the live bot
+DEFAULT_PARAMETERS = {
+    'sma_period': 14,
+    'rsi_period': 14,
+    'rsi_oversold': 30,
+    'rsi_overbought': 70,
+    'macd_fast': 12,
+    'macd_slow': 26,
+    'macd_signal': 9,
+    'sr_window': 5,
+    'min_confirmations': 3,
+    'stop_loss_pct': 0.02,
+    'take_profit_pct': 0.05
+}
+
+# Parameters that change the exits only, not the signals
+EXIT_PARAMETERS = ('stop_loss_pct', 'take_profit_pct')
+
+# Metrics averaged over symbols in the results table
+SUMMARY_COLUMNS = ['total_return', 'win_rate', 'max_drawdown', 'average_return']
+
+
+def _is_valid(parameters):
+    return (parameters['macd_fast'] < parameters['macd_slow']
+            and parameters['rsi_oversold'] < parameters['rsi_overbought'])
+
+
+def grid_search(grid):
+    """Every combination of the values in grid, other parameters at their defaults"""
+    names = list(grid)
+    combinations = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        parameters = {**DEFAULT_PARAMETERS, **dict(zip(names, values))}
+        if _is_valid(parameters):
+            combinations.append(parameters)
+    return combinations
+
+
+def random_search(space, samples, seed=None):
+    """samples random combinations drawn from the candidate values in space"""
+    rng = random.Random(seed)
+    combinations = []
+    for _ in range(samples * 10):
+        parameters = {**DEFAULT_PARAMETERS, **{name: rng.choice(values) for name, values in space.items()}}
+        if _is_valid(parameters) and parameters not in combinations:
+            combinations.append(parameters)
+        if len(combinations) == samples:
+            break
+    return combinations
+
+
+def _signal_key(parameters):
+    return tuple(sorted((name, value) for name, value in parameters.items() if name not in EXIT_PARAMETERS))
+
+
+def _evaluate(symbol, packed, combinations):
+    """Backtest combinations on one symbol, sharing one indicator cache
+
+    combinations are sorted by _signal_key, so the cache only ever needs the
+    signals of the current rule set.
+    """
+    candles = pd.DataFrame(packed)
+    cache = {}
+    rows = []
+    for parameters in combinations:
+        summary = run_backtest(candles, cache=cache, **parameters)['summary']
+        rows.append({'symbol': symbol, **parameters, **summary})
+    return rows
+
+
+def optimize(histories, combinations, max_workers=None, output='sweep_results.csv'):
+    """Backtest every parameter combination on every symbol and rank them
+
+    histories maps symbol to a kline DataFrame. Combinations are sorted so
+    runs sharing indicator settings land in the same worker task and reuse
+    its cache, then spread over a process pool. Results are averaged over
+    symbols, ranked by total return and written to output as CSV when given.
+    """
+    combinations = sorted(combinations, key=_signal_key)
+    workers = max_workers or os.cpu_count() or 1
+    chunks = max(1, workers // max(len(histories), 1))
+    size = max(1, -(-len(combinations) // chunks))
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_evaluate, symbol, pack_candles(data), combinations[start:start + size])
+            for symbol, data in histories.items()
+            for start in range(0, len(combinations), size)
+        ]
+        for future in as_completed(futures):
+            rows.extend(future.result())
+
+    results = pd.DataFrame(rows)
+    results[SUMMARY_COLUMNS] = results[SUMMARY_COLUMNS].astype(float)
+    parameters = list(DEFAULT_PARAMETERS)
+    ranked = results.groupby(parameters, as_index=False).agg(
+        symbols=('symbol', 'count'),
+        trades=('trades', 'sum'),
+        **{column: (column, 'mean') for column in SUMMARY_COLUMNS}
+    ).sort_values('total_return', ascending=False, ignore_index=True)
+
+    if output:
+        ranked.to_csv(output, index=False)
+    return ranked
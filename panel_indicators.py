@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+from candles import numeric_column
+
+# Panel versions of the indicators in indicators.py. Every input is a 2-D
+# (symbols x time) array, or a DataFrame with one row per symbol, and every
+# output keeps that layout. Each indicator runs as a single vectorized pass
+# over all symbols instead of one pandas call per symbol. Shorter histories
+# can be left-padded with NaN, see stack_panel().
+
+
+def as_panel(values):
+    """Return a (symbols x time) float64 array"""
+    if isinstance(values, pd.DataFrame):
+        values = values.to_numpy()
+    panel = np.asarray(values, dtype=np.float64)
+    if panel.ndim == 1:
+        panel = panel[np.newaxis, :]
+    return panel
+
+
+def stack_panel(frames, column='close', length=None):
+    """Stack one column of many kline DataFrames into a (symbols x time) array
+
+    frames maps symbol to DataFrame. Series are aligned on their most recent
+    candle and shorter ones are left-padded with NaN.
+    """
+    symbols = list(frames)
+    columns = [numeric_column(frames[symbol], column) for symbol in symbols]
+    length = length or max((len(values) for values in columns), default=0)
+    panel = np.full((len(symbols), length), np.nan)
+    for row, values in enumerate(columns):
+        values = values[-length:]
+        panel[row, length - len(values):] = values
+    return symbols, panel
+
+
+def _frame(values):
+    """Wrap a panel as a (time x symbols) DataFrame so pandas works per symbol"""
+    return pd.DataFrame(as_panel(values).T)
+
+
+def _unframe(frame):
+    return frame.to_numpy().T
+
+
+def calculate_sma_panel(close, period=50):
+    """Calculate the Simple Moving Average (SMA), NaN until the window fills"""
+    return _unframe(_frame(close).rolling(window=period).mean())
+
+
+def calculate_ema_panel(close, period=50):
+    """Calculate the Exponential Moving Average (EMA)"""
+    return _unframe(_frame(close).ewm(span=period, adjust=False).mean())
+
+
+def calculate_rsi_panel(close, period=14, smoothing=True):
+    """Calculate the Relative Strength Index (RSI) with smoothing (optional)"""
+    close = _frame(close)
+    delta = close.diff()
+
+    # Leave NaN padding in front of shorter histories out of the windows
+    started = close.notna().cummax()
+    gain = delta.where(delta > 0, 0).where(started).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).where(started).rolling(window=period).mean()
+
+    rsi = 100 - (100 / (1 + gain / loss))
+    if smoothing:
+        rsi = rsi.ewm(span=period, adjust=False).mean()
+    return _unframe(rsi)
+
+
+def calculate_macd_panel(close, fast_period=12, slow_period=26, signal_period=9):
+    """Calculate the Moving Average Convergence Divergence (MACD)"""
+    close = _frame(close)
+    macd_line = close.ewm(span=fast_period, adjust=False).mean() - close.ewm(span=slow_period, adjust=False).mean()
+    signal_line = macd_line.ewm(span=signal_period, adjust=False).mean()
+    return {'macd_line': _unframe(macd_line), 'signal_line': _unframe(signal_line)}
+
+
+def calculate_stochastic_panel(high, low, close, k_period=14, d_period=3):
+    """Calculate the Stochastic Oscillator"""
+    low_min = _frame(low).rolling(window=k_period).min()
+    high_max = _frame(high).rolling(window=k_period).max()
+
+    stoch_k = 100 * (_frame(close) - low_min) / (high_max - low_min)
+    stoch_d = stoch_k.rolling(window=d_period).mean()
+    return {'stochastic_k': _unframe(stoch_k), 'stochastic_d': _unframe(stoch_d)}
+
+
+def calculate_fibonacci_panel(high, low):
+    """Calculate Fibonacci retracement levels per symbol, one value per row"""
+    max_price = np.nanmax(as_panel(high), axis=1)
+    min_price = np.nanmin(as_panel(low), axis=1)
+    diff = max_price - min_price
+
+    return {
+        'level_0': max_price,
+        'level_236': max_price - 0.236 * diff,
+        'level_382': max_price - 0.382 * diff,
+        'level_50': max_price - 0.5 * diff,
+        'level_618': max_price - 0.618 * diff,
+        'level_100': min_price
+    }
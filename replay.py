@@ -0,0 +1,268 @@
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+import data_fetcher
+import main
+from analysis import AnalysisCache
+from benchmark import synthetic_candles
+from candle_store import STORE_COLUMNS, CandleStore
+from data_fetcher import INTERVAL_SECONDS, MAX_KLINES, KlineCache, RateLimiter
+from metrics import metrics, set_quiet
+from scheduler import CandleScheduler
+
+# Replays recorded or synthetic klines through the full main.py pipeline
+# (scheduler, fetch, buffers, analysis, report) against a local MEXC
+# stand-in on a virtual clock, as fast as the pipeline runs, e.g.
+#
+#   python replay.py --symbols 120 --bars 1440
+#   python replay.py --store candles --workers 4
+
+# Stages reported from the shared metrics, in pipeline order
+REPORT_STAGES = ['fetch', 'parse', 'analysis', 'indicators', 'patterns', 'support_resistance', 'signal']
+
+
+class VirtualClock:
+    """Clock whose sleep() advances time instantly, for the scheduler's clock and sleep"""
+
+    def __init__(self, start):
+        self.now = float(start)
+        self.lock = threading.Lock()
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self.lock:
+            self.now += max(seconds, 0.0)
+
+
+class ReplayServer:
+    """In-process HTTP server answering /api/v3/klines from in-memory candle columns
+
+    Only candles closed by the clock's current time are served, so the bot
+    sees the history unfold as it would live. series maps each symbol (e.g.
+    BTC_USDT) to a dict of STORE_COLUMNS arrays.
+    """
+
+    def __init__(self, series, clock, host='127.0.0.1', port=0):
+        self.series = {symbol.replace('_', ''): columns for symbol, columns in series.items()}
+        self.clock = clock
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True  # Headers and body are written separately
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                status, body = replay.respond(url.path, {key: values[0] for key, values in parse_qs(url.query).items()})
+                body = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def respond(self, path, params):
+        """Status code and JSON body of one request"""
+        if path != '/api/v3/klines':
+            return 404, {'msg': 'Not found'}
+        columns = self.series.get(params.get('symbol'))
+        if columns is None:
+            return 400, {'msg': 'Invalid symbol.'}
+
+        timestamps, close_times = columns['timestamp'], columns['close_time']
+        limit = min(int(params.get('limit', 500)), MAX_KLINES)
+        closed = np.searchsorted(close_times, self.clock.time() * 1000, side='left')
+        last = closed
+        if 'endTime' in params:
+            last = min(last, np.searchsorted(timestamps, int(params['endTime']), side='right'))
+        if 'startTime' in params:
+            first = np.searchsorted(timestamps, int(params['startTime']), side='left')
+            last = min(last, first + limit)
+        else:
+            first = max(last - limit, 0)
+        return 200, _kline_rows(columns, first, last)
+
+
+def _kline_rows(columns, first, last):
+    """Rows first:last in the MEXC payload layout, prices and volumes as strings"""
+    values = [columns[column][first:last].tolist() for column in STORE_COLUMNS]
+    return [
+        [open_time, str(open_), str(high), str(low), str(close), str(volume), close_time, str(quote_volume)]
+        for open_time, open_, high, low, close, volume, close_time, quote_volume in zip(*values)
+    ]
+
+
+def synthetic_series(symbols, bars, interval='1m', seed=42, start=1_700_000_000_000):
+    """Seeded random-walk candles for symbols, aligned to interval boundaries"""
+    period = INTERVAL_SECONDS[interval] * 1000
+    open_time = start - start % period + np.arange(bars, dtype=np.int64) * period
+    series = {}
+    for i, symbol in enumerate(symbols):
+        df = synthetic_candles(bars, seed + i)
+        series[symbol] = {column: df[column].to_numpy(dtype=dtype) for column, dtype in STORE_COLUMNS.items()
+                          if column not in ('timestamp', 'close_time')}
+        series[symbol]['timestamp'] = open_time
+        series[symbol]['close_time'] = open_time + period - 1
+    return series
+
+
+def recorded_series(root='candles', interval='1m'):
+    """Every series of interval held by a CandleStore, copied into memory"""
+    store = CandleStore(root)
+    return {
+        symbol: {column: np.array(values) for column, values in store.read(symbol, interval).items()}
+        for symbol, stored_interval in store.series() if stored_interval == interval
+    }
+
+
+def replay(series, interval='1m', warmup=200, max_workers=8, analysis_workers=0, timeframes=()):
+    """Drive main.process_symbol over series on a virtual clock and return throughput and latency stats
+
+    The clock starts once warmup candles have closed and stops after the
+    last candle; main's buffers, caches and rate limiter are replaced for
+    the run and base_url points at the local server. timeframes sets main's
+    confirm_timeframes.
+    """
+    period = INTERVAL_SECONDS[interval]
+    start = max(int(columns['timestamp'][min(warmup, len(columns['timestamp']) - 1)]) for columns in series.values()) / 1000
+    end = max(int(columns['close_time'][-1]) + 1 for columns in series.values()) / 1000
+
+    clock = VirtualClock(start)
+    server = ReplayServer(series, clock).start()
+    saved = (data_fetcher.base_url, main.kline_cache, main.rate_limiter, main.analysis_cache, main.analysis_pool,
+             main.confirm_timeframes, main.timeframes)
+    data_fetcher.base_url = server.url
+    main.confirm_timeframes, main.timeframes = list(timeframes), {}
+    main.kline_cache = KlineCache(depth=MAX_KLINES, typed=True)
+    main.rate_limiter = RateLimiter(rate=1e9)  # No throttling against the local server
+    main.analysis_cache = AnalysisCache()
+    if analysis_workers:
+        main.analysis_pool = ProcessPoolExecutor(max_workers=analysis_workers)
+
+    scheduler = CandleScheduler(main.process_symbol, max_workers=max_workers, cooldown=main.signal_cooldown,
+                                clock=clock.time, sleep=clock.sleep)
+    for symbol in series:
+        scheduler.add(symbol, interval)
+
+    before = metrics.snapshot()['events']
+    started = time.perf_counter()
+    cycles = 0
+    try:
+        while scheduler.next_wakeup() - scheduler.settle <= end:
+            clock.sleep(scheduler.next_wakeup() - clock.time())
+            if scheduler.run_pending():
+                cycles += 1
+            scheduler.drain()  # Keep the virtual clock still until the submitted jobs are done
+    finally:
+        seconds = time.perf_counter() - started
+        scheduler.executor.shutdown()
+        if main.analysis_pool is not None:
+            main.analysis_pool.shutdown()
+        server.stop()
+        cache = main.analysis_cache.stats()
+        (data_fetcher.base_url, main.kline_cache, main.rate_limiter, main.analysis_cache, main.analysis_pool,
+         main.confirm_timeframes, main.timeframes) = saved
+
+    snapshot = metrics.snapshot()
+
+    def counted(event):
+        return snapshot['events'].get(event, {}).get('all', 0) - before.get(event, {}).get('all', 0)
+
+    analyzed, signals = counted('analyzed'), counted('signals')
+    return {
+        'symbols': len(series),
+        'cycles': cycles,
+        'simulated_seconds': cycles * period,
+        'seconds': seconds,
+        'analyzed': analyzed,
+        'signals': signals,
+        'fetch_errors': counted('fetch_errors'),
+        'analyses_per_second': analyzed / seconds if seconds else None,
+        'signals_per_second': signals / seconds if seconds else None,
+        'speedup': cycles * period / seconds if seconds else None,
+        'analysis_cache': cache,
+        'stages': {stage: snapshot['stages'][stage]['all'] for stage in REPORT_STAGES if stage in snapshot['stages']}
+    }
+
+
+def _format(stats):
+    lines = [
+        f"Replayed {stats['cycles']} candles of {stats['symbols']} symbols in {stats['seconds']:.2f}s "
+        f"({stats['speedup'] or 0:,.0f}x real time)",
+        f"{stats['analyzed']} analyses ({stats['analyses_per_second'] or 0:,.1f}/s), "
+        f"{stats['signals']} signals ({stats['signals_per_second'] or 0:,.2f}/s), {stats['fetch_errors']} fetch errors",
+        f"Analysis cache: {stats['analysis_cache']['hits']} hits, {stats['analysis_cache']['misses']} misses "
+        f"({stats['analysis_cache']['hit_rate'] or 0:.0%})",
+        f"{'stage':<20} {'count':>8} {'p50 ms':>10} {'p99 ms':>10}"
+    ]
+    for stage, values in stats['stages'].items():
+        lines.append(f"{stage:<20} {values['count']:>8} {(values['p50'] or 0) * 1000:>10.3f} {(values['p99'] or 0) * 1000:>10.3f}")
+    return "\n".join(lines)
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description="Replay klines through the bot against a local MEXC stand-in")
+    parser.add_argument('--symbols', type=int, default=12, help="number of synthetic symbols")
+    parser.add_argument('--bars', type=int, default=1440, help="candles per synthetic symbol")
+    parser.add_argument('--store', help="replay every series of a CandleStore root instead of synthetic candles")
+    parser.add_argument('--interval', default='1m')
+    parser.add_argument('--warmup', type=int, default=200, help="candles already closed when the replay starts")
+    parser.add_argument('--threads', type=int, default=8, help="scheduler worker threads")
+    parser.add_argument('--workers', type=int, default=0, help="analysis processes, 0 analyzes on the scheduler threads")
+    parser.add_argument('--timeframes', type=lambda text: [interval for interval in text.split(",") if interval],
+                        default=[], help="comma separated confirmation timeframes, e.g. 5m,15m")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--verbose', action='store_true', help="print the per-symbol reports")
+    parser.add_argument('--save', help="write the stats to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.store:
+        series = recorded_series(args.store, args.interval)
+    else:
+        series = synthetic_series([f"SIM{i}_USDT" for i in range(args.symbols)], args.bars, args.interval, args.seed)
+    if not series:
+        print("Nothing to replay.")
+        return 1
+
+    set_quiet(not args.verbose)
+    stats = replay(series, args.interval, args.warmup, args.threads, args.workers, args.timeframes)
+    set_quiet(False)
+    print(_format(stats))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(stats, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,163 @@
+from collections import deque
+
+import numpy as np
+
+from analysis import BULLISH, BEARISH, analyze
+from candles import Candles
+from data_fetcher import interval_bounds
+
+# Columns aggregated into higher timeframe candles
+BAR_COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume', 'close_time', 'quote_asset_volume')
+
+
+class Resampler:
+    """Builds candles of a higher timeframe incrementally from 1m candles
+
+    Each 1m candle updates the current bar in constant time. A candle with
+    the same open time as the previous one replaces it, so the in-progress
+    1m candle can be fed on every poll. A bar is completed as soon as the
+    1m candle ending it is fed, and a leading bar whose first 1m candles
+    were never fed is dropped rather than passed off as complete. Completed
+    bars are kept up to depth.
+    """
+
+    def __init__(self, interval='5m', depth=1000):
+        self.interval = interval
+        self.bars = {column: deque(maxlen=depth) for column in BAR_COLUMNS}
+        self.bucket = None
+        self.bucket_end = None  # Open time of the next bar
+        self.base = None  # Aggregate of the bar's 1m candles before the last one
+        self.last = None  # Latest 1m candle of the bar, may still be forming
+        self.partial = False  # The bar started after its first 1m candle
+        self.closed = False  # The bar's last 1m candle was fed
+
+    def update(self, candle):
+        """Add or replace one 1m candle (a mapping of kline fields)"""
+        timestamp = int(candle['timestamp'])
+        if self.last is not None and timestamp < self.last['timestamp']:
+            return  # Late update of a candle already superseded
+        close_time = int(candle.get('close_time', timestamp + 59_999))
+        candle = {
+            'timestamp': timestamp,
+            'open': float(candle['open']),
+            'high': float(candle['high']),
+            'low': float(candle['low']),
+            'close': float(candle['close']),
+            'volume': float(candle['volume']),
+            'quote_asset_volume': float(candle.get('quote_asset_volume', 0.0))
+        }
+
+        bucket, bucket_end = interval_bounds(timestamp, self.interval)
+        if bucket != self.bucket:
+            if self.bucket is not None and not self.closed:
+                self._complete()  # The previous bar's last 1m candle never came
+            self.bucket, self.bucket_end, self.base, self.closed = bucket, bucket_end, None, False
+            self.partial = self.last is None and timestamp != bucket
+        elif timestamp != self.last['timestamp']:
+            self.base = self._aggregate()
+        self.last = candle
+
+        if close_time >= self.bucket_end - 1:
+            self._complete()
+
+    def _complete(self):
+        """Store the bar being built, or replace it when its last 1m candle was fed again"""
+        if not self.partial:
+            for column, value in self._aggregate().items():
+                if self.closed:
+                    self.bars[column][-1] = value
+                else:
+                    self.bars[column].append(value)
+        self.closed = True
+
+    def current(self):
+        """The bar being built, or None when there is none or it is completed or partial"""
+        if self.last is None or self.closed or self.partial:
+            return None
+        return self._aggregate()
+
+    def _aggregate(self):
+        last, base = self.last, self.base
+        return {
+            'timestamp': self.bucket,
+            'open': base['open'] if base else last['open'],
+            'high': max(base['high'], last['high']) if base else last['high'],
+            'low': min(base['low'], last['low']) if base else last['low'],
+            'close': last['close'],
+            'volume': base['volume'] + last['volume'] if base else last['volume'],
+            'close_time': self.bucket_end - 1,
+            'quote_asset_volume': base['quote_asset_volume'] + last['quote_asset_volume'] if base else last['quote_asset_volume']
+        }
+
+    def candles(self, include_current=True):
+        """Completed bars, plus the one being built, as Candles"""
+        columns = {column: list(values) for column, values in self.bars.items()}
+        current = self.current()
+        if include_current and current is not None:
+            for column in BAR_COLUMNS:
+                columns[column].append(current[column])
+        return Candles(**{column: np.array(values) for column, values in columns.items()})
+
+
+class MultiTimeframe:
+    """Resamplers for several higher timeframes fed from one 1m candle feed"""
+
+    def __init__(self, intervals=('5m', '15m', '60m'), depth=1000, cache=None):
+        self.resamplers = {interval: Resampler(interval, depth) for interval in intervals}
+        self.cache = cache
+        self.last_timestamp = None
+
+    def update(self, candle):
+        for resampler in self.resamplers.values():
+            resampler.update(candle)
+        self.last_timestamp = int(candle['timestamp'])
+
+    def update_from(self, candles):
+        """Feed the 1m Candles not seen yet, re-feeding the last one in case it changed"""
+        start = 0 if self.last_timestamp is None else np.searchsorted(candles.timestamp, self.last_timestamp)
+        for i in range(start, len(candles)):
+            self.update({column: getattr(candles, column)[i] for column in BAR_COLUMNS})
+
+    def candles(self, interval):
+        return self.resamplers[interval].candles()
+
+    def analyze(self, symbol, min_confirmations=3):
+        """Run the signal analysis on the closed bars of every timeframe that has one
+
+        A timeframe's result only changes when one of its bars closes, so with
+        an AnalysisCache the other updates are served from the cache.
+        """
+        results = {}
+        for interval, resampler in self.resamplers.items():
+            bars = resampler.candles(include_current=False)
+            if not len(bars):
+                continue
+            key = self.cache.key(symbol, interval, bars, min_confirmations=min_confirmations) if self.cache else None
+            result = self.cache.get(key) if key else None
+            if result is None:
+                result = analyze(symbol, bars, min_confirmations)
+                if key:
+                    self.cache.put(key, result)
+            results[interval] = result
+        return results
+
+
+def combine_confirmations(results, min_timeframes=2):
+    """Combine per-timeframe SignalResults into one multi-timeframe signal
+
+    The signal is confirmed when at least min_timeframes timeframes confirm
+    the same direction. Returns the message, the agreeing timeframes and
+    whether it is confirmed.
+    """
+    agreeing = {BULLISH: [], BEARISH: []}
+    for interval, result in results.items():
+        if result.confirmed and result.message in agreeing:
+            agreeing[result.message].append(interval)
+
+    message = max(agreeing, key=lambda direction: len(agreeing[direction]))
+    timeframes = agreeing[message]
+    return {
+        'message': message if timeframes else None,
+        'timeframes': timeframes,
+        'confirmed': len(timeframes) >= min_timeframes
+    }
@@ -1,5 +1,13 @@
+import numpy as np
 import pandas as pd
 
+# Trade directions
+LONG = 1
+SHORT = -1
+
+# Maintenance margin rate used for liquidation prices
+MAINTENANCE_MARGIN = 0.005
+
 # Function to calculate the Risk/Reward ratio
 def calculate_risk_reward(entry, stop_loss, take_profit):
     """Calculate the Risk/Reward ratio based on entry, stop-loss, and take-profit levels"""
@@ -19,15 +27,88 @@ def calculate_risk_reward(entry, stop_loss, take_profit):
 # Function to calculate risk/reward ratio for a series of trades (for all symbols)
 def calculate_multiple_risk_reward(trades_data):
     """Calculate the Risk/Reward ratios for multiple trades"""
-    risk_reward_ratios = []
-    
-    for trade in trades_data:
-        entry = trade['entry']
-        stop_loss = trade['stop_loss']
-        take_profit = trade['take_profit']
-        
-        risk_reward_ratio = calculate_risk_reward(entry, stop_loss, take_profit)
-        risk_reward_ratios.append(risk_reward_ratio)
-    
-    return pd.Series(risk_reward_ratios, name='risk_reward')
+    entry = np.array([trade['entry'] for trade in trades_data], dtype=np.float64)
+    stop_loss = np.array([trade['stop_loss'] for trade in trades_data], dtype=np.float64)
+    take_profit = np.array([trade['take_profit'] for trade in trades_data], dtype=np.float64)
+    return pd.Series(calculate_risk_reward_array(entry, stop_loss, take_profit), name='risk_reward')
+
+
+# The array functions below take scalars or NumPy arrays (one element per
+# trade) and broadcast, so thousands of candidate trades are sized at once.
+# side is LONG (1) or SHORT (-1), per trade or for all of them.
+
+def calculate_risk_reward_array(entry, stop_loss, take_profit, side=LONG):
+    """Risk/Reward ratios of many trades, NaN where the levels are invalid"""
+    entry, stop_loss, take_profit = (np.asarray(values, dtype=np.float64) for values in (entry, stop_loss, take_profit))
+    risk = (entry - stop_loss) * side
+    reward = (take_profit - entry) * side
+    valid = (entry > 0) & (stop_loss > 0) & (take_profit > 0) & (risk != 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(valid, reward / risk, np.nan)
+
+
+def calculate_exits(entry, side=LONG, stop_loss_pct=0.02, take_profit_pct=0.05, atr=None, stop_atr=None, take_atr=None):
+    """Stop-loss and take-profit levels, as ATR multiples when atr and the multipliers are given
+
+    Without ATR the levels are fixed percentages of the entry (2% / 5% by
+    default, the levels analysis uses).
+    """
+    entry = np.asarray(entry, dtype=np.float64)
+    stop_distance = entry * stop_loss_pct if atr is None or stop_atr is None else np.asarray(atr) * stop_atr
+    take_distance = entry * take_profit_pct if atr is None or take_atr is None else np.asarray(atr) * take_atr
+    return entry - stop_distance * side, entry + take_distance * side
+
+
+def calculate_position_size(equity, entry, stop_loss, risk_per_trade=0.01, leverage=1):
+    """Quantity that loses risk_per_trade of equity at the stop, capped by the leveraged equity
+
+    Returns 0 where the stop is at the entry or a level is invalid.
+    """
+    entry, stop_loss = np.asarray(entry, dtype=np.float64), np.asarray(stop_loss, dtype=np.float64)
+    distance = np.abs(entry - stop_loss)
+    valid = (entry > 0) & (distance > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        quantity = np.minimum(equity * risk_per_trade / distance, equity * leverage / entry)
+    return np.where(valid, quantity, 0.0)
+
+
+def calculate_liquidation_price(entry, leverage, side=LONG, maintenance_margin=MAINTENANCE_MARGIN):
+    """Isolated-margin liquidation price of futures positions opened at entry"""
+    entry = np.asarray(entry, dtype=np.float64)
+    return entry * (1 - side * (1 / np.asarray(leverage, dtype=np.float64) - maintenance_margin))
+
+
+def calculate_exposure(symbols, quantity, price, side=LONG):
+    """Long, short, net and gross notional exposure per symbol and in total
+
+    symbols, quantity and price hold one element per open position; the
+    positions of each symbol are summed with one bincount per column.
+    """
+    names, codes = np.unique(np.asarray(symbols), return_inverse=True)
+    notional = np.asarray(quantity, dtype=np.float64) * np.asarray(price, dtype=np.float64)
+    side = np.broadcast_to(side, notional.shape)
+    long = np.bincount(codes, weights=np.where(side > 0, notional, 0.0), minlength=len(names))
+    short = np.bincount(codes, weights=np.where(side < 0, notional, 0.0), minlength=len(names))
+    exposure = pd.DataFrame({'long': long, 'short': short, 'net': long - short, 'gross': long + short}, index=names)
+    exposure.loc['total'] = exposure.sum()
+    return exposure
+
+
+def plan_trades(equity, entry, side=LONG, risk_per_trade=0.01, leverage=1, atr=None, stop_atr=None, take_atr=None,
+                stop_loss_pct=0.02, take_profit_pct=0.05, maintenance_margin=MAINTENANCE_MARGIN):
+    """Exits, Risk/Reward, size and liquidation price of many candidate trades at once
 
+    Trades whose stop lies beyond the liquidation price would be liquidated
+    first and get a size of 0.
+    """
+    stop_loss, take_profit = calculate_exits(entry, side, stop_loss_pct, take_profit_pct, atr, stop_atr, take_atr)
+    liquidation = calculate_liquidation_price(entry, leverage, side, maintenance_margin)
+    quantity = calculate_position_size(equity, entry, stop_loss, risk_per_trade, leverage)
+    safe = (stop_loss - liquidation) * side > 0
+    return {
+        'stop_loss': stop_loss,
+        'take_profit': take_profit,
+        'risk_reward': calculate_risk_reward_array(entry, stop_loss, take_profit, side),
+        'quantity': np.where(safe, quantity, 0.0),
+        'liquidation_price': liquidation
+    }
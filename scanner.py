@@ -0,0 +1,170 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+import requests
+
+from analysis import analyze
+from data_fetcher import INTERVAL_SECONDS, KlineCache, fetch_tickers, get_rate_limiter, get_session, interval_bounds
+from metrics import echo, metrics
+
+# Quote currency of the scanned pairs
+QUOTE = 'USDT'
+
+# Handed to each analysis worker once the fetch stage is done
+_DONE = object()
+
+
+def prefilter(tickers, quote=QUOTE, min_quote_volume=500_000, top=None):
+    """Symbols (e.g. BTC_USDT) of the quote pairs traded enough over 24h, most traded first"""
+    if not tickers:
+        return []
+    df = pd.DataFrame(tickers, columns=['symbol', 'lastPrice', 'quoteVolume'])
+    names = df['symbol'].astype(str).to_numpy()
+    price = pd.to_numeric(df['lastPrice'], errors='coerce').to_numpy()
+    volume = pd.to_numeric(df['quoteVolume'], errors='coerce').to_numpy()
+
+    keep = df['symbol'].astype(str).str.endswith(quote).to_numpy() & (price > 0) & (volume >= min_quote_volume)
+    order = np.argsort(-volume[keep], kind='stable')
+    names = names[keep][order][:top]
+    return [f"{name[:-len(quote)]}_{quote}" for name in names]
+
+
+def _analyze(symbol, interval, data):
+    return analyze(symbol, data).confirmed
+
+
+class Scanner:
+    """Market-wide sweep: ticker pre-filter, then bounded fetch and analysis stages
+
+    Stage one picks the pairs worth a look from a single 24h ticker request.
+    Fetch workers refresh the survivors' candle buffers and hand them to the
+    analysis workers over a bounded queue, so fetching blocks (backpressure)
+    whenever analysis falls behind instead of piling candles up in memory.
+
+    handler(symbol, interval, data) analyzes one symbol and returns True when
+    a signal was confirmed; the symbol then sits out cooldown seconds.
+    """
+
+    def __init__(self, handler=None, interval='1m', fetch_workers=8, analysis_workers=4, queue_size=16,
+                 min_quote_volume=500_000, top=None, cooldown=80, settle=2.0, cache=None, rate_limiter=None,
+                 base=None, clock=time.time, sleep=time.sleep):
+        self.handler = handler or _analyze
+        self.interval = interval
+        self.fetch_workers = fetch_workers
+        self.analysis_workers = analysis_workers
+        self.queue_size = queue_size
+        self.min_quote_volume = min_quote_volume
+        self.top = top
+        self.cooldown = cooldown
+        self.settle = settle
+        self.cache = cache or KlineCache(typed=True)
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.base = base
+        self.clock = clock
+        self.sleep = sleep
+        self.session = get_session(pool_size=fetch_workers)
+        self.cooldowns = {}
+
+    def select(self):
+        """Stage one: the symbols passing the 24h ticker pre-filter"""
+        self.rate_limiter.acquire()
+        try:
+            tickers = fetch_tickers(self.session, self.base)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            echo(f"Ticker request failed: {e}")
+            return []
+        symbols = prefilter(tickers, min_quote_volume=self.min_quote_volume, top=self.top)
+        metrics.count('scan_tickers', amount=len(tickers))
+        metrics.count('scan_selected', amount=len(symbols))
+        return symbols
+
+    def sweep(self, symbols=None):
+        """Fetch and analyze symbols (by default the pre-filtered market) once, returning the sweep's stats"""
+        started = time.perf_counter()
+        if symbols is None:
+            symbols = self.select()
+        now = self.clock()
+        symbols = [symbol for symbol in symbols if self.cooldowns.get(symbol, 0) <= now]
+
+        pending = queue.SimpleQueue()
+        for symbol in symbols:
+            pending.put(symbol)
+        fetched = queue.Queue(maxsize=self.queue_size)
+        lock = threading.Lock()
+        stats = {
+            'selected': len(symbols), 'fetched': 0, 'fetch_errors': 0, 'analyzed': 0, 'analysis_errors': 0,
+            'signals': [], 'blocked_seconds': 0.0
+        }
+
+        def count(event, amount=1):
+            with lock:
+                stats[event] += amount
+            metrics.count(f'scan_{event}', amount=amount)
+
+        def fetch():
+            while True:
+                try:
+                    symbol = pending.get_nowait()
+                except queue.Empty:
+                    return
+                self.rate_limiter.acquire()
+                try:
+                    data = self.cache.get(symbol, self.interval).refresh(self.session, self.base)
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    echo(f"Request failed for {symbol}: {e}")
+                    count('fetch_errors')
+                    continue
+                count('fetched')
+                waiting = time.perf_counter()
+                fetched.put((symbol, data))
+                count('blocked_seconds', time.perf_counter() - waiting)
+
+        def analyze_fetched():
+            while True:
+                item = fetched.get()
+                if item is _DONE:
+                    return
+                symbol, data = item
+                try:
+                    confirmed = self.handler(symbol, self.interval, data)
+                except Exception as e:
+                    echo(f"Analysis failed for {symbol}: {e}")
+                    count('analysis_errors')
+                    continue
+                count('analyzed')
+                if confirmed:
+                    with lock:
+                        stats['signals'].append(symbol)
+                        self.cooldowns[symbol] = self.clock() + self.cooldown
+
+        with ThreadPoolExecutor(max_workers=self.analysis_workers) as analysts, \
+                ThreadPoolExecutor(max_workers=self.fetch_workers) as fetchers:
+            analyzing = [analysts.submit(analyze_fetched) for _ in range(self.analysis_workers)]
+            wait([fetchers.submit(fetch) for _ in range(self.fetch_workers)])
+            stats['fetch_seconds'] = time.perf_counter() - started
+            for _ in analyzing:
+                fetched.put(_DONE)
+            wait(analyzing)
+
+        stats['seconds'] = time.perf_counter() - started
+        stats['fetch_rate'] = stats['fetched'] / stats['fetch_seconds'] if stats['fetch_seconds'] else None
+        stats['analysis_rate'] = stats['analyzed'] / stats['seconds'] if stats['seconds'] else None
+        metrics.observe('scan_sweep', stats['seconds'])
+        return stats
+
+    def run_forever(self):
+        """Sweep the market after every candle close"""
+        period = INTERVAL_SECONDS[self.interval]
+        while True:
+            stats = self.sweep()
+            echo(f"\n\U0001F50E Scanned {stats['analyzed']}/{stats['selected']} symbols in {stats['seconds']:.1f}s "
+                 f"(fetch {stats['fetch_rate'] or 0:.1f}/s, analysis {stats['analysis_rate'] or 0:.1f}/s, "
+                 f"{stats['fetch_errors']} fetch errors, {len(stats['signals'])} signals) \U0001F50E\n")
+            if stats['seconds'] > period:
+                echo(f"Sweep took longer than one {self.interval} candle, raise the rate limit or the volume filter.")
+            now = self.clock()
+            self.sleep(max(0.0, interval_bounds(now * 1000, self.interval)[1] / 1000 + self.settle - now))
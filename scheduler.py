@@ -0,0 +1,110 @@
+import heapq
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from data_fetcher import interval_bounds
+from metrics import echo, metrics
+
+
+class CandleScheduler:
+    """Run a handler per (symbol, interval) each time one of its candles closes
+
+    handler(symbol, interval) runs the whole fetch/analysis pipeline for one
+    symbol on a worker thread and returns True when a signal was confirmed.
+    The symbol is then put on cooldown instead of pausing every other symbol.
+    Jobs are submitted without waiting for each other, so a slow symbol never
+    delays the next wake-up; a symbol whose previous run hasn't finished
+    skips that candle. Lag is measured from candle close to the end of the
+    handler.
+    """
+
+    def __init__(self, handler, max_workers=8, cooldown=80, settle=2.0, clock=time.time, sleep=time.sleep):
+        self.handler = handler
+        self.cooldown = cooldown
+        self.settle = settle
+        self.clock = clock
+        self.sleep = sleep
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.jobs = []
+        self.cooldowns = {}
+        self.running = {}  # Symbol -> future of its unfinished run
+        self.lock = threading.Lock()
+        self.lags = deque(maxlen=1000)
+        self.reported = 0  # Lags recorded when run_forever last printed them
+
+    def _next_close(self, interval, now):
+        return interval_bounds(now * 1000, interval)[1] / 1000
+
+    def add(self, symbol, interval='1m'):
+        """Watch symbol on interval, starting with its most recently closed candle"""
+        last_close = interval_bounds(self.clock() * 1000, interval)[0] / 1000
+        heapq.heappush(self.jobs, (last_close, symbol, interval))
+
+    def next_wakeup(self):
+        """Time at which the next job becomes due"""
+        return self.jobs[0][0] + self.settle if self.jobs else None
+
+    def run_pending(self):
+        """Submit every job whose candle has closed and return how many were submitted"""
+        now = self.clock()
+        submitted = 0
+        while self.jobs and self.jobs[0][0] + self.settle <= now:
+            close, symbol, interval = heapq.heappop(self.jobs)
+            heapq.heappush(self.jobs, (self._next_close(interval, now), symbol, interval))
+            if self.cooldowns.get(symbol, 0) > now:
+                continue
+            with self.lock:
+                if symbol in self.running:
+                    metrics.count('overruns', symbol)
+                    continue
+                future = self.executor.submit(self.handler, symbol, interval)
+                self.running[symbol] = future
+            future.add_done_callback(lambda future, close=close, symbol=symbol: self._finished(future, close, symbol))
+            submitted += 1
+        return submitted
+
+    def _finished(self, future, close, symbol):
+        try:
+            confirmed = future.result()
+        except Exception as e:
+            metrics.count('analysis_errors', symbol)
+            echo(f"Analysis failed for {symbol}: {e}")
+            confirmed = False
+        finished = self.clock()
+        self.lags.append(finished - close)
+        metrics.observe('cycle_lag', finished - close, symbol)
+        if confirmed:
+            self.cooldowns[symbol] = finished + self.cooldown
+        with self.lock:
+            self.running.pop(symbol, None)
+
+    def drain(self):
+        """Wait until every submitted job has finished"""
+        with self.lock:
+            futures = list(self.running.values())
+        wait(futures)
+
+    def lag_stats(self):
+        """Seconds from candle close to analysis completion over recent runs"""
+        if not self.lags:
+            return None
+        lags = list(self.lags)
+        return {
+            'last': lags[-1],
+            'mean': sum(lags) / len(lags),
+            'max': max(lags)
+        }
+
+    def run_forever(self):
+        """Sleep until the next candle closes, submit the due jobs, repeat"""
+        try:
+            while True:
+                if self.run_pending() and len(self.lags) != self.reported:
+                    self.reported = len(self.lags)
+                    stats = self.lag_stats()
+                    echo(f"\n\u23F3 Cycle lag: last {stats['last']:.2f}s, mean {stats['mean']:.2f}s, max {stats['max']:.2f}s \u23F3\n")
+                self.sleep(max(0.0, self.next_wakeup() - self.clock()))
+        finally:
+            self.executor.shutdown(wait=False)
@@ -0,0 +1,206 @@
+import math
+from collections import deque
+
+# Streaming versions of the indicators in indicators.py. Each state object is
+# fed one closed candle at a time with update(candle), where candle is any
+# mapping holding 'high', 'low' and 'close', and keeps running sums, EMA state
+# and monotonic deques so every update costs constant time. Values match the
+# batch functions within floating point tolerance and are NaN until warmed up.
+
+NAN = float('nan')
+
+
+def _divide(numerator, denominator):
+    """Divide like pandas does, giving inf or NaN instead of raising"""
+    if denominator == 0:
+        if numerator == 0 or math.isnan(numerator):
+            return NAN
+        return math.copysign(math.inf, numerator)
+    return numerator / denominator
+
+
+class _EWM:
+    """Exponential weighted mean matching pandas ewm(span, adjust=False)"""
+
+    def __init__(self, span):
+        self.alpha = 2 / (span + 1)
+        self.value = NAN
+        self._old_weight = 1.0
+
+    def update(self, x):
+        if not math.isnan(self.value):
+            self._old_weight *= 1 - self.alpha
+            if not math.isnan(x):
+                if self.value != x:
+                    self.value = (self._old_weight * self.value + self.alpha * x) / (self._old_weight + self.alpha)
+                self._old_weight = 1.0
+        elif not math.isnan(x):
+            self.value = x
+        return self.value
+
+
+class _RollingMean:
+    """Rolling mean over a fixed window kept as a running sum"""
+
+    def __init__(self, period):
+        self.period = period
+        self.window = deque()
+        self.total = 0.0
+        self.nans = 0
+        self.nonzero = 0
+
+    def update(self, x):
+        if len(self.window) == self.period:
+            old = self.window.popleft()
+            if math.isnan(old):
+                self.nans -= 1
+            else:
+                self.total -= old
+                self.nonzero -= old != 0
+        self.window.append(x)
+        if math.isnan(x):
+            self.nans += 1
+        else:
+            self.total += x
+            self.nonzero += x != 0
+        if len(self.window) < self.period or self.nans:
+            return NAN
+        if not self.nonzero:
+            # Drop the rounding error left behind by the running sum
+            self.total = 0.0
+        return self.total / self.period
+
+
+class _RollingExtreme:
+    """Rolling min or max over a fixed window using a monotonic deque"""
+
+    def __init__(self, period, use_max=False):
+        self.period = period
+        self.use_max = use_max
+        self.candidates = deque()
+        self.nan_positions = deque()
+        self.count = 0
+
+    def update(self, x):
+        position = self.count
+        self.count += 1
+        start = position - self.period + 1
+        while self.candidates and self.candidates[0][0] < start:
+            self.candidates.popleft()
+        while self.nan_positions and self.nan_positions[0] < start:
+            self.nan_positions.popleft()
+        if math.isnan(x):
+            self.nan_positions.append(position)
+        else:
+            while self.candidates and (self.candidates[-1][1] <= x if self.use_max else self.candidates[-1][1] >= x):
+                self.candidates.pop()
+            self.candidates.append((position, x))
+        if self.count < self.period or self.nan_positions:
+            return NAN
+        return self.candidates[0][1]
+
+
+class SMAState:
+    """Streaming Simple Moving Average (SMA) of the close"""
+
+    def __init__(self, period=50):
+        self.period = period
+        self._mean = _RollingMean(period)
+        self.value = NAN
+
+    def update(self, candle):
+        self.value = self._mean.update(float(candle['close']))
+        return self.value
+
+
+class EMAState:
+    """Streaming Exponential Moving Average (EMA) of the close"""
+
+    def __init__(self, period=50):
+        self.period = period
+        self._ewm = _EWM(period)
+        self.value = NAN
+
+    def update(self, candle):
+        self.value = self._ewm.update(float(candle['close']))
+        return self.value
+
+
+class RSIState:
+    """Streaming Relative Strength Index (RSI) with optional smoothing"""
+
+    def __init__(self, period=14, smoothing=True):
+        self.period = period
+        self.smoothing = smoothing
+        self._gain = _RollingMean(period)
+        self._loss = _RollingMean(period)
+        self._smoother = _EWM(period)
+        self._previous_close = NAN
+        self.value = NAN
+
+    def update(self, candle):
+        close = float(candle['close'])
+        delta = close - self._previous_close
+        self._previous_close = close
+        # Missing deltas count as neither gain nor loss, as in the batch version
+        gain = self._gain.update(delta if delta > 0 else 0.0)
+        loss = self._loss.update(-delta if delta < 0 else 0.0)
+        rsi = 100 - _divide(100, 1 + _divide(max(gain, 0.0), max(loss, 0.0)))
+        self.value = self._smoother.update(rsi) if self.smoothing else rsi
+        return self.value
+
+
+class MACDState:
+    """Streaming Moving Average Convergence Divergence (MACD)"""
+
+    def __init__(self, fast_period=12, slow_period=26, signal_period=9):
+        self._fast = _EWM(fast_period)
+        self._slow = _EWM(slow_period)
+        self._signal = _EWM(signal_period)
+        self.macd_line = NAN
+        self.signal_line = NAN
+
+    @property
+    def value(self):
+        return {'macd_line': self.macd_line, 'signal_line': self.signal_line}
+
+    def update(self, candle):
+        close = float(candle['close'])
+        self.macd_line = self._fast.update(close) - self._slow.update(close)
+        self.signal_line = self._signal.update(self.macd_line)
+        return self.value
+
+
+class StochasticState:
+    """Streaming Stochastic Oscillator"""
+
+    def __init__(self, k_period=14, d_period=3):
+        self._low_min = _RollingExtreme(k_period)
+        self._high_max = _RollingExtreme(k_period, use_max=True)
+        self._k_window = deque(maxlen=d_period)
+        self.d_period = d_period
+        self.stochastic_k = NAN
+        self.stochastic_d = NAN
+
+    @property
+    def value(self):
+        return {'stochastic_k': self.stochastic_k, 'stochastic_d': self.stochastic_d}
+
+    def update(self, candle):
+        low_min = self._low_min.update(float(candle['low']))
+        high_max = self._high_max.update(float(candle['high']))
+        self.stochastic_k = 100 * _divide(float(candle['close']) - low_min, high_max - low_min)
+        self._k_window.append(self.stochastic_k)
+        # The %D window is only a few candles long, so it is summed directly
+        if len(self._k_window) == self.d_period:
+            self.stochastic_d = sum(self._k_window) / self.d_period
+        return self.value
+
+
+def warm_up(data, *states):
+    """Feed every row of a kline DataFrame or Candles into the given indicator states"""
+    for high, low, close in zip(data['high'], data['low'], data['close']):
+        candle = {'high': high, 'low': low, 'close': close}
+        for state in states:
+            state.update(candle)
+    return states
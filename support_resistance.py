@@ -1,41 +1,63 @@
 import pandas as pd
 import numpy as np
 
+from candles import numeric_column
+
+# Local extreme test shared by support and resistance
+def _local_extremes(data, column, window, use_max):
+    """Keep values equal to the extreme of the window [i - window, i + window)"""
+    values = numeric_column(data, column)
+    n = len(values)
+
+    # A rolling window of 2 * window candles ending at i + window - 1 starts at i - window
+    rolling = pd.Series(values).rolling(window=2 * window)
+    extremes = (rolling.max() if use_max else rolling.min()).to_numpy()[2 * window - 1:n - 1]
+
+    centers = values[window:n - window]
+    levels = np.where(centers == extremes, centers, np.nan)
+    return pd.Series(levels, index=data.index[window:n - window])
+
 # Function to calculate support levels
 def calculate_support(data, window=5):
     """Calculate Support levels (local minima)"""
-    support_levels = []
-    for i in range(window, len(data) - window):
-        if data['low'][i] == min(data['low'][i - window:i + window]):
-            support_levels.append(data['low'][i])
-        else:
-            support_levels.append(np.nan)
-    
-    return pd.Series(support_levels, index=data.index[window:len(data) - window])
+    return _local_extremes(data, 'low', window, use_max=False)
 
 # Function to calculate resistance levels
 def calculate_resistance(data, window=5):
     """Calculate Resistance levels (local maxima)"""
-    resistance_levels = []
-    for i in range(window, len(data) - window):
-        if data['high'][i] == max(data['high'][i - window:i + window]):
-            resistance_levels.append(data['high'][i])
-        else:
-            resistance_levels.append(np.nan)
-    
-    return pd.Series(resistance_levels, index=data.index[window:len(data) - window])
+    return _local_extremes(data, 'high', window, use_max=True)
+
+# Function to group nearby levels into zones
+def cluster_levels(levels, tolerance=0.002):
+    """Cluster levels lying within tolerance (relative) of each other
+
+    Returns (price, touches) tuples, the most touched level first.
+    """
+    values = np.sort(pd.Series(levels).dropna().to_numpy(dtype=np.float64))
+    if len(values) == 0:
+        return []
+
+    # Start a new cluster wherever the gap to the previous level is too wide
+    breaks = np.flatnonzero(np.diff(values) > tolerance * np.abs(values[:-1])) + 1
+    clusters = [(float(group.mean()), len(group)) for group in np.split(values, breaks)]
+    return sorted(clusters, key=lambda cluster: cluster[1], reverse=True)
 
 # Function to calculate support and resistance levels together
-def calculate_support_resistance(data, window=5):
-    """Calculate both Support and Resistance levels"""
+def calculate_support_resistance(data, window=5, clustered=False, tolerance=0.002):
+    """Calculate both Support and Resistance levels
+
+    With clustered=True all levels are returned as (price, touches) lists
+    ranked by touch count instead of the latest values.
+    """
     support = calculate_support(data, window)
     resistance = calculate_resistance(data, window)
-    
+
+    if clustered:
+        return cluster_levels(support, tolerance), cluster_levels(resistance, tolerance)
+
     # Handle cases where there may be NaN values in support or resistance
     support = support.dropna().iloc[-1] if not support.dropna().empty else None
     resistance = resistance.dropna().iloc[-1] if not resistance.dropna().empty else None
-    
+
     # Return the latest support and resistance values
     return support, resistance
-
-
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators
+import panel_indicators
+from benchmark import synthetic_candles
+
+# Histories of different lengths, the shorter ones get left-padded with NaN
+LENGTHS = [300, 240, 90, 31]
+
+
+@pytest.fixture(scope='module')
+def frames():
+    return {f"SYM{i}_USDT": synthetic_candles(length, seed=i) for i, length in enumerate(LENGTHS)}
+
+
+@pytest.fixture(scope='module')
+def panel(frames):
+    return {column: panel_indicators.stack_panel(frames, column)[1] for column in ('high', 'low', 'close')}
+
+
+def assert_row_matches(row, expected, length):
+    """The last length values of a panel row equal the per-symbol series, the padding is NaN"""
+    assert np.isnan(row[:len(row) - length]).all()
+    np.testing.assert_allclose(row[len(row) - length:], np.asarray(expected, dtype=np.float64), rtol=1e-9, equal_nan=True)
+
+
+def test_stack_panel_pads_shorter_histories(frames):
+    symbols, panel = panel_indicators.stack_panel(frames, 'close')
+    assert symbols == list(frames)
+    assert panel.shape == (len(LENGTHS), max(LENGTHS))
+    for row, df in zip(panel, frames.values()):
+        assert_row_matches(row, df['close'], len(df))
+
+
+def test_sma_matches_per_symbol(frames, panel):
+    result = panel_indicators.calculate_sma_panel(panel['close'], 14)
+    for row, df in zip(result, frames.values()):
+        # calculate_sma drops the warm-up NaNs, the panel keeps them
+        expected = indicators.calculate_sma(df, period=14).reindex(df.index)
+        assert_row_matches(row, expected, len(df))
+
+
+def test_ema_matches_per_symbol(frames, panel):
+    result = panel_indicators.calculate_ema_panel(panel['close'])
+    for row, df in zip(result, frames.values()):
+        assert_row_matches(row, indicators.calculate_ema(df), len(df))
+
+
+@pytest.mark.parametrize('smoothing', [True, False])
+def test_rsi_matches_per_symbol(frames, panel, smoothing):
+    result = panel_indicators.calculate_rsi_panel(panel['close'], smoothing=smoothing)
+    for row, df in zip(result, frames.values()):
+        assert_row_matches(row, indicators.calculate_rsi(df, smoothing=smoothing), len(df))
+
+
+def test_macd_matches_per_symbol(frames, panel):
+    result = panel_indicators.calculate_macd_panel(panel['close'])
+    for i, df in enumerate(frames.values()):
+        expected = indicators.calculate_macd(df)
+        for line in ('macd_line', 'signal_line'):
+            assert_row_matches(result[line][i], expected[line], len(df))
+
+
+def test_stochastic_matches_per_symbol(frames, panel):
+    result = panel_indicators.calculate_stochastic_panel(panel['high'], panel['low'], panel['close'])
+    for i, df in enumerate(frames.values()):
+        expected = indicators.calculate_stochastic(df)
+        for line in ('stochastic_k', 'stochastic_d'):
+            assert_row_matches(result[line][i], expected[line], len(df))
+
+
+def test_fibonacci_matches_per_symbol(frames, panel):
+    result = panel_indicators.calculate_fibonacci_panel(panel['high'], panel['low'])
+    for i, df in enumerate(frames.values()):
+        for level, value in indicators.calculate_fibonacci(df.copy()).items():
+            assert result[level][i] == pytest.approx(value, rel=1e-12)
+
+
+def test_dataframe_panel_matches_array(panel):
+    close = pd.DataFrame(panel['close'])
+    np.testing.assert_array_equal(panel_indicators.calculate_ema_panel(close), panel_indicators.calculate_ema_panel(panel['close']))
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+import indicators
+import streaming_indicators
+from benchmark import synthetic_candles
+
+
+@pytest.fixture(scope='module')
+def frame():
+    df = synthetic_candles(300, seed=7)
+    # A missing close has to be skipped by the windows the same way pandas does
+    df.loc[150, 'close'] = np.nan
+    return df
+
+
+def stream(df, state, line=None):
+    """Value of state after each candle of df"""
+    values = []
+    for candle in df[['high', 'low', 'close']].to_dict('records'):
+        state.update(candle)
+        values.append(state.value if line is None else state.value[line])
+    return np.asarray(values, dtype=np.float64)
+
+
+def assert_matches(values, expected):
+    np.testing.assert_allclose(values, np.asarray(expected, dtype=np.float64), rtol=1e-9, equal_nan=True)
+
+
+def test_sma_matches_batch(frame):
+    # calculate_sma drops the warm-up NaNs, the stream reports them
+    expected = indicators.calculate_sma(frame, period=14).reindex(frame.index)
+    assert_matches(stream(frame, streaming_indicators.SMAState(14)), expected)
+
+
+def test_ema_matches_batch(frame):
+    assert_matches(stream(frame, streaming_indicators.EMAState()), indicators.calculate_ema(frame))
+
+
+@pytest.mark.parametrize('smoothing', [True, False])
+def test_rsi_matches_batch(frame, smoothing):
+    state = streaming_indicators.RSIState(smoothing=smoothing)
+    assert_matches(stream(frame, state), indicators.calculate_rsi(frame, smoothing=smoothing))
+
+
+@pytest.mark.parametrize('line', ['macd_line', 'signal_line'])
+def test_macd_matches_batch(frame, line):
+    assert_matches(stream(frame, streaming_indicators.MACDState(), line), indicators.calculate_macd(frame)[line])
+
+
+@pytest.mark.parametrize('line', ['stochastic_k', 'stochastic_d'])
+def test_stochastic_matches_batch(frame, line):
+    assert_matches(stream(frame, streaming_indicators.StochasticState(), line), indicators.calculate_stochastic(frame)[line])
+
+
+def test_warm_up_matches_last_batch_values(frame):
+    sma, rsi = streaming_indicators.warm_up(frame, streaming_indicators.SMAState(), streaming_indicators.RSIState())
+    assert sma.value == pytest.approx(indicators.calculate_sma(frame).iloc[-1], rel=1e-9)
+    assert rsi.value == pytest.approx(indicators.calculate_rsi(frame).iloc[-1], rel=1e-9)